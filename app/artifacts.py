@@ -0,0 +1,201 @@
+import os
+import time
+import uuid
+import shutil
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from app.config import (
+    OUTPUT_DIR, UPLOAD_DIR, TEMP_DIR, AUDIO_DIR, TRANSCRIPT_CACHE_DIR, OUTPUT_TTL_SECONDS, OUTPUT_MAX_BYTES,
+    UPLOAD_TTL_SECONDS, UPLOAD_MAX_BYTES, WORK_TTL_SECONDS, TRANSCRIPT_CACHE_TTL_SECONDS, TRANSCRIPT_CACHE_MAX_BYTES,
+    SWEEP_INTERVAL_SECONDS
+)
+from app.metrics import ARTIFACT_EVICTIONS
+
+logger = logging.getLogger("uvicorn")
+
+# Area names
+AREA_OUTPUTS = "outputs"
+AREA_UPLOADS = "uploads"
+AREA_WORK = "work"
+AREA_AUDIO = "audio"
+AREA_TRANSCRIPTS = "transcripts"
+
+@dataclass
+class Area:
+    """A directory of artifacts with a retention policy (0 = no limit)."""
+    path: str
+    ttl_seconds: float = 0
+    max_bytes: int = 0
+
+def _entry_stat(path: str) -> Tuple[float, int]:
+    """(last modification, size) of a file, or of the newest file and total size of a directory tree."""
+    stat = os.stat(path)
+    if not os.path.isdir(path):
+        return stat.st_mtime, stat.st_size
+    mtime, size = stat.st_mtime, 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                file_stat = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            mtime = max(mtime, file_stat.st_mtime)
+            size += file_stat.st_size
+    return mtime, size
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class ArtifactStore:
+    """Owns everything the service writes to disk: IDs, per-request workspaces and retention.
+
+    Each request works in its own workspace under the work area, removed when the
+    request ends, whether it succeeded or not. Whatever outlives a request (uploads
+    kept for restyling, outputs waiting to be downloaded, cached transcripts) lives
+    in an area with a TTL and a size quota that `sweep` enforces, least recently used
+    first. An entry's last use is its mtime, so `touch` marks it used and the order
+    survives restarts and is shared between processes.
+    """
+
+    def __init__(self, areas: Dict[str, Area]):
+        self.areas = areas
+        # Workspaces of this process still in use; the sweeper never removes them
+        self._live: Set[str] = set()
+        self._lock = threading.Lock()
+        for area in areas.values():
+            os.makedirs(area.path, exist_ok=True)
+
+    @staticmethod
+    def new_id() -> str:
+        """Collision-free ID for a request or job (also its file and workspace name)."""
+        return uuid.uuid4().hex
+
+    def path(self, area: str, *parts: str) -> str:
+        return os.path.join(self.areas[area].path, *parts)
+
+    def area_of(self, path: str) -> Optional[str]:
+        """Name of the area `path` lies in (or is), or None when sweeps never touch it."""
+        path = os.path.abspath(path)
+        for name, area in self.areas.items():
+            area_path = os.path.abspath(area.path)
+            if os.path.commonpath([path, area_path]) == area_path:
+                return name
+        return None
+
+    def make_workspace(self, prefix: str = "") -> str:
+        """Creates a private directory in the work area; pair with remove_workspace."""
+        work_dir = tempfile.mkdtemp(prefix=f"{prefix}{self.new_id()}_", dir=self.areas[AREA_WORK].path)
+        with self._lock:
+            self._live.add(work_dir)
+        return work_dir
+
+    def remove_workspace(self, work_dir: str) -> None:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        with self._lock:
+            self._live.discard(work_dir)
+
+    @contextmanager
+    def workspace(self, prefix: str = "") -> Iterator[str]:
+        """A workspace for the duration of the block, removed however the block exits."""
+        work_dir = self.make_workspace(prefix)
+        try:
+            yield work_dir
+        finally:
+            self.remove_workspace(work_dir)
+
+    @staticmethod
+    def touch(path: str) -> None:
+        """Marks an artifact as just used, so eviction picks it last."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def sweep(self, protected: Iterable[str] = ()) -> int:
+        """Removes expired entries, then the least recently used ones of areas over quota.
+
+        Only top-level entries of each area are considered (a directory counts as one
+        entry). Hidden files, live workspaces and `protected` paths are never removed.
+        Returns the number of bytes freed.
+        """
+        return sum(self.sweep_area(name, protected) for name in self.areas)
+
+    def sweep_area(self, name: str, protected: Iterable[str] = ()) -> int:
+        """`sweep` for a single area, e.g. right after writing to it; returns the bytes freed."""
+        with self._lock:
+            keep = {os.path.abspath(path) for path in protected} | self._live
+        area = self.areas[name]
+        now = time.time()
+        entries: List[Tuple[float, int, str]] = []
+        total = 0
+        for entry_name in os.listdir(area.path):
+            path = os.path.join(area.path, entry_name)
+            try:
+                mtime, size = _entry_stat(path)
+            except FileNotFoundError:
+                continue
+            total += size
+            if not entry_name.startswith(".") and path not in keep:
+                entries.append((mtime, size, path))
+
+        freed = 0
+        # Oldest use first
+        entries.sort()
+        for mtime, size, path in entries:
+            expired = area.ttl_seconds and now - mtime > area.ttl_seconds
+            if not expired and not (area.max_bytes and total > area.max_bytes):
+                # Everything after this is newer, and the area is already under quota
+                break
+            reason = "expired" if expired else "quota"
+            _remove(path)
+            total -= size
+            freed += size
+            ARTIFACT_EVICTIONS.labels(name, reason).inc()
+            logger.info(f"Removed {reason} artifact {name}/{os.path.basename(path)} ({size} bytes)")
+        return freed
+
+    def start_sweeper(
+        self, protected: Callable[[], Iterable[str]] = lambda: (), interval: float = SWEEP_INTERVAL_SECONDS,
+        after_sweep: Callable[[], None] = lambda: None
+    ) -> Tuple[threading.Thread, threading.Event]:
+        """Sweeps every `interval` seconds in a daemon thread until the returned event is set.
+
+        `protected` is called before each sweep for paths still in use elsewhere
+        (e.g. the uploads of queued jobs); `after_sweep` runs other retention work
+        on the same schedule (e.g. purging old job events).
+        """
+        stop_event = threading.Event()
+
+        def run() -> None:
+            while True:
+                try:
+                    self.sweep(protected())
+                    after_sweep()
+                except Exception as e:
+                    logger.warning(f"Artifact sweep failed: {e}")
+                if stop_event.wait(interval):
+                    return
+
+        thread = threading.Thread(target=run, name="artifact-sweeper", daemon=True)
+        thread.start()
+        return thread, stop_event
+
+artifact_store = ArtifactStore({
+    AREA_OUTPUTS: Area(OUTPUT_DIR, OUTPUT_TTL_SECONDS, OUTPUT_MAX_BYTES),
+    AREA_UPLOADS: Area(UPLOAD_DIR, UPLOAD_TTL_SECONDS, UPLOAD_MAX_BYTES),
+    # Workspaces are removed by their request; the TTL only catches leftovers of a crash
+    AREA_WORK: Area(TEMP_DIR, WORK_TTL_SECONDS),
+    # Only written with SUBIT_KEEP_AUDIO_WAV
+    AREA_AUDIO: Area(AUDIO_DIR, WORK_TTL_SECONDS),
+    AREA_TRANSCRIPTS: Area(TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_TTL_SECONDS, TRANSCRIPT_CACHE_MAX_BYTES),
+})
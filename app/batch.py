@@ -0,0 +1,189 @@
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from app.services import ModelManager
+from app.pipeline import process_video, output_path_for
+from app.schemas import SubtitleConfig
+from app.artifacts import artifact_store
+from app.config import BATCH_OUTPUT_DIR, JOB_CONCURRENCY
+
+logger = logging.getLogger("uvicorn")
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv", ".webm", ".m4v")
+# Written to the output directory; records what each output was rendered from
+MANIFEST_NAME = ".subit-batch.json"
+
+def find_videos(inputs: List[str], recursive: bool = False, exclude_dir: Optional[str] = None) -> List[str]:
+    """Expands directories and glob patterns into a sorted, de-duplicated list of video files.
+
+    Files under `exclude_dir` (the output directory) are left out so outputs never become inputs.
+    """
+    excluded = os.path.join(os.path.abspath(exclude_dir), "") if exclude_dir else None
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        else:
+            candidates = glob.glob(item, recursive=recursive)
+        found.update(
+            os.path.abspath(path) for path in candidates
+            if os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS)
+        )
+    return sorted(path for path in found if not (excluded and path.startswith(excluded)))
+
+def base_names(videos: List[str]) -> Dict[str, str]:
+    """Output base name per video: the file stem, plus a path hash when two stems collide."""
+    stems: Dict[str, int] = {}
+    for video in videos:
+        stem = os.path.splitext(os.path.basename(video))[0]
+        stems[stem] = stems.get(stem, 0) + 1
+    names = {}
+    for video in videos:
+        stem = os.path.splitext(os.path.basename(video))[0]
+        if stems[stem] > 1:
+            stem = f"{stem}_{hashlib.sha1(video.encode()).hexdigest()[:8]}"
+        names[video] = stem
+    return names
+
+def config_hash(settings: SubtitleConfig) -> str:
+    return hashlib.sha256(settings.model_dump_json().encode()).hexdigest()
+
+def source_signature(video: str, settings: SubtitleConfig) -> dict:
+    stat = os.stat(video)
+    return {"source": video, "size": stat.st_size, "mtime": stat.st_mtime, "config": config_hash(settings)}
+
+class Manifest:
+    """Remembers which input and settings produced each output, so reruns skip finished files."""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries: Dict[str, dict] = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable batch manifest {self.path}: {e}")
+            self.entries = {}
+
+    def is_up_to_date(self, output_path: str, signature: dict) -> bool:
+        return os.path.exists(output_path) and self.entries.get(os.path.basename(output_path)) == signature
+
+    def record(self, output_path: str, signature: dict) -> None:
+        with self._lock:
+            self.entries[os.path.basename(output_path)] = signature
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+def run_batch(
+    videos: List[str], settings: SubtitleConfig, output_dir: str = BATCH_OUTPUT_DIR,
+    concurrency: int = JOB_CONCURRENCY, force: bool = False
+) -> dict:
+    """Processes every video with one shared model; returns the summary report.
+
+    Videos run `concurrency` at a time. The stage scheduler lets one transcribe while
+    others extract or burn, and the model is loaded once up front for all of them.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = Manifest(output_dir)
+    names = base_names(videos)
+    results: List[dict] = []
+    results_lock = threading.Lock()
+
+    # Load once before the pool starts; every file then hits the registry
+    if settings.transcription_mode != "parallel":
+        ModelManager.load_model(settings.use_gpu, settings.model_size)
+
+    def process(video: str) -> None:
+        base_name = names[video]
+        output_path = output_path_for(base_name, settings, output_dir)
+        signature = source_signature(video, settings)
+        result = {"input": video, "output": output_path}
+        if not force and manifest.is_up_to_date(output_path, signature):
+            result.update(status="skipped", seconds=0.0)
+            logger.info(f"Up to date, skipping: {video}")
+        else:
+            start = time.perf_counter()
+            try:
+                output_path, _ = process_video(video, base_name, settings, output_dir=output_dir)
+                manifest.record(output_path, signature)
+                result.update(status="done", output=output_path)
+                logger.info(f"Done: {video} -> {output_path}")
+            except Exception as e:
+                logger.exception(f"Failed: {video}")
+                result.update(status="failed", error=str(e))
+            result["seconds"] = round(time.perf_counter() - start, 2)
+        with results_lock:
+            results.append(result)
+
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as executor:
+        list(executor.map(process, videos))
+
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("done", "skipped", "failed")}
+    return {
+        "started_at": started_at,
+        "wall_seconds": round(time.perf_counter() - start, 2),
+        "concurrency": concurrency,
+        "settings": settings.model_dump(),
+        "counts": counts,
+        "files": sorted(results, key=lambda r: r["input"]),
+    }
+
+def load_settings(config_path: Optional[str]) -> SubtitleConfig:
+    if not config_path:
+        return SubtitleConfig()
+    with open(config_path, "r", encoding="utf-8") as f:
+        return SubtitleConfig.model_validate_json(f.read())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Subtitle every video in a directory or glob with one shared model")
+    parser.add_argument("inputs", nargs="+", help="Video files, directories or glob patterns (quote globs)")
+    parser.add_argument("--config", help="JSON file with SubtitleConfig fields (same as the API's config_json)")
+    parser.add_argument("--output-dir", default=BATCH_OUTPUT_DIR, help="Where outputs and the batch manifest are written")
+    parser.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY, help="Videos processed at once")
+    parser.add_argument("--recursive", action="store_true", help="Descend into subdirectories and expand ** in globs")
+    parser.add_argument("--force", action="store_true", help="Reprocess videos whose outputs are up to date")
+    parser.add_argument("--report", help="Summary report path (default: <output-dir>/batch_report.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    swept_area = artifact_store.area_of(args.output_dir)
+    if swept_area:
+        logger.warning(
+            f"--output-dir is inside the '{swept_area}' artifact area: while the API runs, its retention "
+            f"sweeper removes these outputs and the next batch run redoes them"
+        )
+    settings = load_settings(args.config)
+    videos = find_videos(args.inputs, args.recursive, exclude_dir=args.output_dir)
+    if not videos:
+        parser.error("no video files matched")
+    logger.info(f"Batch: {len(videos)} video(s), concurrency {args.concurrency}")
+
+    report = run_batch(videos, settings, args.output_dir, args.concurrency, args.force)
+    report_path = args.report or os.path.join(args.output_dir, "batch_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    counts = report["counts"]
+    print(
+        f"{counts['done']} done, {counts['skipped']} skipped, {counts['failed']} failed "
+        f"in {report['wall_seconds']}s. Report: {report_path}"
+    )
+    for result in report["files"]:
+        if result["status"] == "failed":
+            print(f"  FAILED {result['input']}: {result['error']}")
+    sys.exit(1 if counts["failed"] else 0)
@@ -0,0 +1,155 @@
+import time
+import queue
+import logging
+import threading
+import numpy as np
+from dataclasses import dataclass
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+# Module internals of faster-whisper 1.2, whose layout changes between minor releases (pinned in requirements.txt)
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.transcribe import TranscriptionOptions, get_suppressed_tokens, restore_speech_timestamps
+from faster_whisper.vad import VadOptions, collect_chunks, get_speech_timestamps
+from app.services import TranscriptSegment, SAMPLE_RATE
+from app.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+
+logger = logging.getLogger("uvicorn")
+
+class BatcherClosedError(RuntimeError):
+    """The batcher was closed before the request's windows were queued."""
+
+@dataclass
+class _Window:
+    """One <=30 s window of one request, waiting for a batch slot."""
+    features: np.ndarray
+    metadata: dict
+    lang: str
+    result: Future
+
+class BatchedTranscriber:
+    """Runs windows from many concurrent requests through one model in shared batches.
+
+    Each request is split into VAD windows and queued. A single inference thread
+    drains the queue into batches of up to `max_batch_size` windows, waiting at most
+    `max_wait_ms` for a batch to fill, and routes each window's segments back to the
+    request that owns it. A lone request still fills whole batches with its own
+    windows, so single-request latency only pays the wait once per batch.
+
+    `close` stops the thread once every window already queued is decoded, which
+    releases the model; the registry closes a batcher whenever it drops one.
+    """
+
+    def __init__(self, model: WhisperModel, max_batch_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pipeline = BatchedInferencePipeline(model)
+        self._chunk_length = model.feature_extractor.chunk_length
+        # None is the stop sentinel put by close()
+        self._queue: "queue.Queue[Optional[_Window]]" = queue.Queue()
+        self._closed = False
+        # Makes a request's windows and close()'s sentinel go into the queue in a clear order
+        self._queue_lock = threading.Lock()
+        # lang -> (tokenizer, options); only touched by the inference thread
+        self._decoding: Dict[str, Tuple[Tokenizer, TranscriptionOptions]] = {}
+        self._thread = threading.Thread(target=self._run, name="batched-inference", daemon=True)
+        self._thread.start()
+
+    def transcribe(self, audio: np.ndarray, lang: str) -> List[TranscriptSegment]:
+        """Blocking; safe to call from any number of threads at once."""
+        if not self.model.model.is_multilingual:
+            lang = "en"
+        vad_options = VadOptions(max_speech_duration_s=self._chunk_length, min_silence_duration_ms=160)
+        speech = get_speech_timestamps(audio, vad_options, sampling_rate=SAMPLE_RATE)
+        if not speech:
+            return []
+
+        audio_chunks, chunks_metadata = collect_chunks(audio, speech, sampling_rate=SAMPLE_RATE, max_duration=self._chunk_length)
+        windows = [
+            _Window(features=pad_or_trim(self.model.feature_extractor(chunk)[..., :-1]), metadata=metadata, lang=lang, result=Future())
+            for chunk, metadata in zip(audio_chunks, chunks_metadata)
+        ]
+        with self._queue_lock:
+            if self._closed:
+                raise BatcherClosedError("Batched transcriber was closed (its model was unloaded)")
+            for window in windows:
+                self._queue.put(window)
+
+        segments = []
+        for window in windows:
+            for output in window.result.result():
+                segments.append(TranscriptSegment(start=output["start"], end=output["end"], text=output["text"]))
+        # Window times are on the speech-only timeline; map them back onto the original audio
+        return list(restore_speech_timestamps(segments, speech, SAMPLE_RATE))
+
+    def close(self) -> None:
+        """Stops the inference thread after the windows already queued; later requests raise BatcherClosedError."""
+        with self._queue_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+    def _decoding_for(self, lang: str) -> Tuple[Tokenizer, TranscriptionOptions]:
+        if lang not in self._decoding:
+            tokenizer = Tokenizer(self.model.hf_tokenizer, self.model.model.is_multilingual, task="transcribe", language=lang)
+            # Same decoding settings BatchedInferencePipeline.transcribe uses by default
+            options = TranscriptionOptions(
+                beam_size=5, best_of=5, patience=1, length_penalty=1, repetition_penalty=1,
+                no_repeat_ngram_size=0, log_prob_threshold=-1.0, no_speech_threshold=0.6,
+                compression_ratio_threshold=2.4, condition_on_previous_text=False,
+                prompt_reset_on_temperature=0.5, temperatures=[0.0], initial_prompt=None,
+                prefix=None, suppress_blank=True, suppress_tokens=get_suppressed_tokens(tokenizer, [-1]),
+                without_timestamps=True, max_initial_timestamp=0.0, word_timestamps=False,
+                prepend_punctuations="\"'“¿([{-", append_punctuations="\"'.。,，!！?？:：”)]}、",
+                multilingual=False, max_new_tokens=None, clip_timestamps="0",
+                hallucination_silence_threshold=None, hotwords=None,
+            )
+            self._decoding[lang] = (tokenizer, options)
+        return self._decoding[lang]
+
+    def _collect_batch(self) -> Tuple[List[_Window], bool]:
+        """The next batch, and whether the stop sentinel came after it."""
+        window = self._queue.get()
+        if window is None:
+            return [], True
+        batch = [window]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Past the deadline, still take whatever is already queued
+                window = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if window is None:
+                return batch, True
+            batch.append(window)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect_batch()
+            # The language token is part of the prompt, so each language decodes separately
+            by_lang: Dict[str, List[_Window]] = {}
+            for window in batch:
+                by_lang.setdefault(window.lang, []).append(window)
+            for lang, windows in by_lang.items():
+                try:
+                    tokenizer, options = self._decoding_for(lang)
+                    outputs = self._pipeline.forward(
+                        np.stack([w.features for w in windows]), tokenizer, [w.metadata for w in windows], options
+                    )
+                except Exception as e:
+                    logger.error(f"Batched inference failed: {e}")
+                    for window in windows:
+                        window.result.set_exception(e)
+                    continue
+                for window, output in zip(windows, outputs):
+                    window.result.set_result(output)
+            logger.debug(f"Batched inference: {len(batch)} window(s) across {len(by_lang)} language(s)")
+        # With the thread gone, the batcher (and its model) is freed once in-flight requests let go of it
+        logger.info("Batched inference thread stopped")
@@ -0,0 +1,93 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+from typing import List, Optional, Union
+from app.services import TranscriptSegment
+from app.artifacts import ArtifactStore, AREA_TRANSCRIPTS
+from app.metrics import TRANSCRIPT_CACHE_REQUESTS
+
+logger = logging.getLogger("uvicorn")
+
+# What transcript_key returns: a SHA-256 hex digest. Keys also arrive from API forms, and
+# only these may ever be joined into a cache path.
+TRANSCRIPT_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+def is_transcript_key(key: str) -> bool:
+    return bool(TRANSCRIPT_KEY_PATTERN.match(key))
+
+def transcript_key(audio: Union[str, np.ndarray], lang: str, model_size: str, compute_type: str, mode: str = "single") -> str:
+    """Content hash of the decoded audio plus everything that changes the transcript."""
+    digest = hashlib.sha256()
+    if isinstance(audio, np.ndarray):
+        digest.update(np.ascontiguousarray(audio))
+    else:
+        with open(audio, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    digest.update(f"|{lang}|{model_size}|{compute_type}|{mode}".encode())
+    return digest.hexdigest()
+
+class TranscriptCache:
+    """On-disk transcript cache in an area of the artifact store.
+
+    Entries are JSON files named by key; a file's mtime is its last use. The store
+    owns retention: its TTL and LRU size quota for the area apply, and are enforced
+    right after every write as well as by the periodic sweep.
+    """
+
+    def __init__(self, store: ArtifactStore, area: str = AREA_TRANSCRIPTS):
+        self.store = store
+        self.area = area
+        self.cache_dir = store.path(area)
+
+    def _path(self, key: str) -> str:
+        if not is_transcript_key(key):
+            raise ValueError(f"Invalid transcript key: {key!r}")
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def contains(self, key: str) -> bool:
+        return is_transcript_key(key) and os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[List[TranscriptSegment]]:
+        """Cached segments, or None on a miss; keys that aren't transcript keys are always misses."""
+        if not is_transcript_key(key):
+            TRANSCRIPT_CACHE_REQUESTS.labels("miss").inc()
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            segments = [TranscriptSegment.from_dict(segment) for segment in data["segments"]]
+            # Mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            TRANSCRIPT_CACHE_REQUESTS.labels("miss").inc()
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable transcript cache entry {key}: {e}")
+            self._remove(path)
+            TRANSCRIPT_CACHE_REQUESTS.labels("miss").inc()
+            return None
+        TRANSCRIPT_CACHE_REQUESTS.labels("hit").inc()
+        logger.info(f"Transcript cache hit: {key}")
+        return segments
+
+    def put(self, key: str, segments: List[TranscriptSegment]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": [segment.to_dict() for segment in segments]}, f)
+        # Atomic publish: readers never see a half-written entry
+        os.replace(tmp_path, path)
+        self.store.sweep_area(self.area)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
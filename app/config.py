@@ -8,10 +8,115 @@ OUTPUT_DIR = os.path.join(BASE_DIR, "outputs")
 ASS_DIR = os.path.join(BASE_DIR, "subtitles")
 FONTS_DIR = os.path.join(BASE_DIR, "fonts")
 TEMP_DIR = os.path.join(BASE_DIR, "temp")
+# Job uploads, kept after the job so it can be restyled or previewed
+UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+TRANSCRIPT_CACHE_DIR = os.path.join(CACHE_DIR, "transcripts")
+# Default output directory of the batch CLI; not one of the areas the API sweeps
+BATCH_OUTPUT_DIR = os.path.join(BASE_DIR, "batch_outputs")
+# Per-process Prometheus metric files, aggregated by /metrics (PROMETHEUS_MULTIPROC_DIR overrides)
+METRICS_DIR = os.path.join(CACHE_DIR, "metrics")
 
 # Ensure directories exist
-for folder in [VIDEO_DIR, AUDIO_DIR, OUTPUT_DIR, ASS_DIR, FONTS_DIR, TEMP_DIR]:
+for folder in [VIDEO_DIR, AUDIO_DIR, OUTPUT_DIR, ASS_DIR, FONTS_DIR, TEMP_DIR, UPLOAD_DIR, TRANSCRIPT_CACHE_DIR, METRICS_DIR]:
     os.makedirs(folder, exist_ok=True)
 
 # Default Settings
 DEFAULT_FONT_NAME = "Playfair Display"
+# Font file providing DEFAULT_FONT_NAME, attached to MKV soft-subtitle outputs
+DEFAULT_FONT_FILE = os.path.join(FONTS_DIR, "PlayfairDisplay-VariableFont_wght.ttf")
+
+# Job Queue
+JOBS_DB_PATH = os.environ.get("SUBIT_JOBS_DB", os.path.join(BASE_DIR, "jobs.db"))
+# Number of worker processes started alongside the API (0 = run `python -m app.worker` separately)
+WORKER_COUNT = int(os.environ.get("SUBIT_WORKERS", "1"))
+WORKER_POLL_INTERVAL = float(os.environ.get("SUBIT_WORKER_POLL_INTERVAL", "1.0"))
+# How often worker processes are checked; a dead one's jobs are requeued and it is restarted
+WORKER_WATCH_INTERVAL = float(os.environ.get("SUBIT_WORKER_WATCH_INTERVAL", "5.0"))
+# How often an open /jobs/{id}/events stream checks for new events
+EVENT_POLL_INTERVAL = float(os.environ.get("SUBIT_EVENT_POLL_INTERVAL", "0.25"))
+# Idle seconds before the stream sends a keep-alive comment (keeps proxies from closing it)
+EVENT_KEEPALIVE_SECONDS = 15.0
+# Events of finished jobs are deleted this long after the job ends (by the artifact sweeper)
+EVENT_RETENTION_SECONDS = float(os.environ.get("SUBIT_EVENT_RETENTION_HOURS", "24")) * 3600
+# How often a progressive download checks the growing output file for new bytes
+STREAM_POLL_INTERVAL = float(os.environ.get("SUBIT_STREAM_POLL_INTERVAL", "0.2"))
+
+# Stage Scheduling
+# Jobs each worker process runs at once; stages of different jobs overlap (one transcribes while another burns)
+JOB_CONCURRENCY = int(os.environ.get("SUBIT_JOB_CONCURRENCY", "2"))
+# Slots shared by the API and its workers: concurrent transcriptions and concurrent ffmpeg processes
+INFERENCE_SLOTS = int(os.environ.get("SUBIT_INFERENCE_SLOTS", "1"))
+FFMPEG_SLOTS = int(os.environ.get("SUBIT_FFMPEG_SLOTS", "2"))
+# Admission control: beyond these, new work is rejected with 429 instead of queued
+MAX_QUEUED_JOBS = int(os.environ.get("SUBIT_MAX_QUEUED_JOBS", "100"))
+MAX_SYNC_REQUESTS = int(os.environ.get("SUBIT_MAX_SYNC_REQUESTS", "2"))
+# Outputs one /generate/variants request may ask for
+MAX_VARIANTS = int(os.environ.get("SUBIT_MAX_VARIANTS", "8"))
+# Retry-After sent with a 429 when there is no job history to estimate from
+DEFAULT_RETRY_AFTER_SECONDS = 30
+
+# Input Limits: inputs beyond these are rejected before any decoding (0 = no limit)
+MAX_INPUT_BYTES = int(float(os.environ.get("SUBIT_MAX_INPUT_MB", "4096")) * 1024 * 1024)
+MAX_INPUT_SECONDS = float(os.environ.get("SUBIT_MAX_INPUT_SECONDS", str(4 * 3600)))
+# Width x height; the default admits 8K UHD
+MAX_INPUT_PIXELS = int(os.environ.get("SUBIT_MAX_INPUT_PIXELS", str(7680 * 4320)))
+
+# Audio
+# Audio whose peak stays below this level is treated as silent and never sent to the model
+SILENCE_THRESHOLD_DBFS = float(os.environ.get("SUBIT_SILENCE_DBFS", "-60"))
+# Ask the model for word timestamps, so subtitle lines start and end with their words
+# (costs some transcription time; transcripts made with and without them are cached separately)
+WORD_TIMESTAMPS = os.environ.get("SUBIT_WORD_TIMESTAMPS", "0") == "1"
+# Debug only: extract to a WAV in AUDIO_DIR (and keep it) instead of streaming PCM in memory
+KEEP_AUDIO_WAV = os.environ.get("SUBIT_KEEP_AUDIO_WAV", "0") == "1"
+
+# Transcript Cache
+# Size bound for cached transcripts; least recently used entries are evicted first
+TRANSCRIPT_CACHE_MAX_BYTES = int(float(os.environ.get("SUBIT_TRANSCRIPT_CACHE_MB", "512")) * 1024 * 1024)
+# Entries unused for this long are removed by the artifact sweeper
+TRANSCRIPT_CACHE_TTL_SECONDS = float(os.environ.get("SUBIT_TRANSCRIPT_CACHE_TTL_HOURS", str(30 * 24))) * 3600
+
+# Artifact Retention: the API sweeps these areas, removing entries unused for the TTL, then
+# least recently used entries until the area is under its quota (0 = no limit)
+SWEEP_INTERVAL_SECONDS = float(os.environ.get("SUBIT_SWEEP_INTERVAL", "300"))
+OUTPUT_TTL_SECONDS = float(os.environ.get("SUBIT_OUTPUT_TTL_HOURS", "24")) * 3600
+OUTPUT_MAX_BYTES = int(float(os.environ.get("SUBIT_OUTPUT_MAX_MB", "20480")) * 1024 * 1024)
+UPLOAD_TTL_SECONDS = float(os.environ.get("SUBIT_UPLOAD_TTL_HOURS", "24")) * 3600
+UPLOAD_MAX_BYTES = int(float(os.environ.get("SUBIT_UPLOAD_MAX_MB", "20480")) * 1024 * 1024)
+# Request workspaces are removed when the request ends; this only catches leftovers of a crash
+WORK_TTL_SECONDS = float(os.environ.get("SUBIT_WORK_TTL_HOURS", "24")) * 3600
+
+# Parallel Transcription (SubtitleConfig.transcription_mode = "parallel")
+PARALLEL_WORKERS = int(os.environ.get("SUBIT_PARALLEL_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+# Target length of each VAD chunk handed to a worker
+PARALLEL_CHUNK_SECONDS = float(os.environ.get("SUBIT_PARALLEL_CHUNK_SECONDS", "60"))
+
+# Batched Inference
+# Share batches of 30 s windows between concurrent requests in one process
+BATCHED_INFERENCE = os.environ.get("SUBIT_BATCHED_INFERENCE", "0") == "1"
+BATCH_MAX_SIZE = int(os.environ.get("SUBIT_BATCH_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("SUBIT_BATCH_MAX_WAIT_MS", "50"))
+
+# Models
+# "auto" uses CUDA when CTranslate2 sees a GPU, "cuda" always tries it first, "cpu" never does
+DEVICE = os.environ.get("SUBIT_DEVICE", "auto")
+DEFAULT_MODEL_SIZE = os.environ.get("SUBIT_MODEL_SIZE", "small")
+GPU_COMPUTE_TYPE = os.environ.get("SUBIT_GPU_COMPUTE_TYPE", "float16")
+CPU_COMPUTE_TYPE = os.environ.get("SUBIT_CPU_COMPUTE_TYPE", "int8")
+# CTranslate2 threads per CPU model (0 = library default)
+CPU_THREADS = int(os.environ.get("SUBIT_CPU_THREADS", "0"))
+# Estimated memory the model registry may hold before evicting least recently used models
+MODEL_MEMORY_BUDGET_BYTES = int(float(os.environ.get("SUBIT_MODEL_MEMORY_MB", "4096")) * 1024 * 1024)
+# Load the default model at startup (API and workers); /readyz reports 503 until it is in memory
+PRELOAD_MODEL = os.environ.get("SUBIT_PRELOAD_MODEL", "1") == "1"
+# After preloading, run one inference on a second of silence so the first request doesn't pay for first-use allocations
+WARMUP = os.environ.get("SUBIT_WARMUP", "0") == "1"
+
+# Segmented Rendering
+# Default number of parallel ffmpeg processes for burning (SubtitleConfig.render_parallelism)
+RENDER_PARALLELISM = int(os.environ.get("SUBIT_RENDER_PARALLELISM", "1"))
+# Segments shorter than this aren't worth a separate ffmpeg process
+RENDER_MIN_SEGMENT_SECONDS = float(os.environ.get("SUBIT_RENDER_MIN_SEGMENT_SECONDS", "10"))
+# Burns of taller inputs are scaled down to this height (0 = keep the input resolution)
+RENDER_MAX_HEIGHT = int(os.environ.get("SUBIT_RENDER_MAX_HEIGHT", "0"))
@@ -0,0 +1,111 @@
+import numpy as np
+from typing import Iterable, Iterator, List, Tuple
+
+# Transcripts are split into subtitle events a block of segments at a time, so memory
+# stays bounded however long they are; within a block, line boundaries and timings of
+# every event come out of one NumPy pass over a flat array of words. At typical segment
+# lengths a block is ~12k words and ~2 MB of working memory.
+EVENT_BLOCK_SEGMENTS = 1024
+
+# (starts, ends, texts) of consecutive events
+EventBlock = Tuple[np.ndarray, np.ndarray, List[str]]
+
+_TWO_DIGITS = tuple(f"{i:02}" for i in range(100))
+
+def _event_block(segments: List, max_words_per_line: int) -> EventBlock:
+    """Events of `segments`, in order.
+
+    Segments with word timestamps get lines that start with their first word and end
+    with their last. Others spread the segment's duration evenly across its words;
+    those are skipped when empty or not longer than zero.
+    """
+    # Tokens that rebuild a line's text when concatenated: whisper word tokens carry their own
+    # leading space (none in zh/ja/th), split words get one added
+    words: List[str] = []
+    word_starts: List[float] = []
+    word_ends: List[float] = []
+    counts: List[int] = []
+    segment_starts: List[float] = []
+    # Seconds per word of an evenly spread segment; NaN when the segment has word timestamps
+    segment_steps: List[float] = []
+    for segment in segments:
+        timed = [word for word in (segment.words or ()) if word.word.strip()]
+        if timed:
+            words.extend(word.word for word in timed)
+            word_starts.extend(word.start for word in timed)
+            word_ends.extend(word.end for word in timed)
+            counts.append(len(timed))
+            segment_starts.append(segment.start)
+            segment_steps.append(np.nan)
+            continue
+        text_words = segment.text.strip().split()
+        duration = segment.end - segment.start
+        if not text_words or duration <= 0:
+            continue
+        words.extend(f" {word}" for word in text_words)
+        word_starts.extend([np.nan] * len(text_words))
+        word_ends.extend([np.nan] * len(text_words))
+        counts.append(len(text_words))
+        segment_starts.append(segment.start)
+        segment_steps.append(duration / len(text_words))
+
+    if not words:
+        return np.zeros(0), np.zeros(0), []
+
+    count = np.array(counts, dtype=np.int64)
+    # Segment of each word, and the word's position within it
+    segment_of = np.repeat(np.arange(len(count)), count)
+    position = np.arange(len(words)) - np.repeat(np.cumsum(count) - count, count)
+    # A line starts at every max_words_per_line-th word of a segment
+    first = np.flatnonzero(position % max_words_per_line == 0)
+    last = np.append(first[1:], len(words)) - 1
+
+    line_segment = segment_of[first]
+    step = np.array(segment_steps)[line_segment]
+    spread = ~np.isnan(step)
+    # Evenly spread lines: segment start + i * step, lasting one step per word
+    spread_starts = np.array(segment_starts)[line_segment] + position[first] * step
+    spread_ends = spread_starts + (last - first + 1) * step
+    timed_starts = np.array(word_starts)[first]
+    timed_ends = np.maximum(np.array(word_ends)[last], timed_starts)
+    starts = np.where(spread, spread_starts, timed_starts)
+    ends = np.where(spread, spread_ends, timed_ends)
+
+    texts = ["".join(words[i:j]).strip() for i, j in zip(first.tolist(), (last + 1).tolist())]
+    return starts, ends, texts
+
+def event_blocks(segments: Iterable, max_words_per_line: int, block_segments: int = EVENT_BLOCK_SEGMENTS) -> Iterator[EventBlock]:
+    """Yields the events of `segments` (any iterable, consumed once) block by block."""
+    block = []
+    for segment in segments:
+        block.append(segment)
+        if len(block) >= block_segments:
+            starts, ends, texts = _event_block(block, max_words_per_line)
+            if texts:
+                yield starts, ends, texts
+            block = []
+    if block:
+        starts, ends, texts = _event_block(block, max_words_per_line)
+        if texts:
+            yield starts, ends, texts
+
+def ass_timestamps(seconds: np.ndarray) -> List[str]:
+    """H:MM:SS.cc for every value, truncated to the centisecond like services.format_time."""
+    seconds = np.maximum(seconds, 0.0)
+    # Whole seconds after rounding to microseconds, as format_time's timedelta does
+    whole = (np.rint(seconds * 1e6) // 1_000_000).astype(np.int64)
+    centis = np.clip(((seconds - whole) * 100).astype(np.int64), 0, 99)
+    hours, rest = np.divmod(whole, 3600)
+    minutes, secs = np.divmod(rest, 60)
+    two = _TWO_DIGITS
+    return [
+        f"{h}:{two[m]}:{two[s]}.{two[c]}"
+        for h, m, s, c in zip(hours.tolist(), minutes.tolist(), secs.tolist(), centis.tolist())
+    ]
+
+def ass_dialogue(starts: np.ndarray, ends: np.ndarray, texts: List[str], prefix: str = "") -> str:
+    """The block's `Dialogue:` lines as one string, each text preceded by `prefix` (override tags)."""
+    return "".join(
+        f"Dialogue: 0,{start},{end},Default,,0,0,0,,{prefix}{text}\n"
+        for start, end, text in zip(ass_timestamps(starts), ass_timestamps(ends), texts)
+    )
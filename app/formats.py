@@ -0,0 +1,44 @@
+import json
+from typing import Callable, Dict, List
+from app.services import TranscriptSegment, create_ass_file, iter_subtitle_events
+from app.schemas import SubtitleConfig
+
+def format_timestamp(seconds: float, decimal_marker: str) -> str:
+    """HH:MM:SS<marker>mmm, as used by SRT (',') and WebVTT ('.')."""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}{decimal_marker}{millis:03}"
+
+def write_srt(segments: List[TranscriptSegment], path: str, settings: SubtitleConfig) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for index, (start, end, text) in enumerate(iter_subtitle_events(segments, settings), 1):
+            f.write(f"{index}\n{format_timestamp(start, ',')} --> {format_timestamp(end, ',')}\n{text}\n\n")
+
+def write_vtt(segments: List[TranscriptSegment], path: str, settings: SubtitleConfig) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("WEBVTT\n\n")
+        for start, end, text in iter_subtitle_events(segments, settings):
+            f.write(f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{text}\n\n")
+
+def write_json(segments: List[TranscriptSegment], path: str, settings: SubtitleConfig) -> None:
+    """Raw transcript segments plus the line-split events the other formats contain."""
+    data = {
+        "lang": settings.lang,
+        "segments": [segment.to_dict() for segment in segments],
+        "events": [
+            {"start": round(start, 3), "end": round(end, 3), "text": text}
+            for start, end, text in iter_subtitle_events(segments, settings)
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+# output_mode -> writer; every writer has create_ass_file's signature
+SUBTITLE_WRITERS: Dict[str, Callable[[List[TranscriptSegment], str, SubtitleConfig], None]] = {
+    "ass": create_ass_file,
+    "srt": write_srt,
+    "vtt": write_vtt,
+    "json": write_json,
+}
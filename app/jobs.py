@@ -0,0 +1,260 @@
+import json
+import time
+import uuid
+import sqlite3
+import logging
+from typing import Callable, Dict, List, Optional
+from app.config import JOBS_DB_PATH
+from app.schemas import SubtitleConfig
+
+logger = logging.getLogger("uvicorn")
+
+# Job lifecycle: queued -> running -> done | failed
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Event types that close a job's event stream
+EVENT_DONE = "done"
+EVENT_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    config TEXT NOT NULL,
+    output_path TEXT,
+    error TEXT,
+    worker_id TEXT,
+    transcript_key TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id);
+"""
+
+# Columns added after the first release; init_db adds them to older databases
+MIGRATIONS = {
+    "transcript_key": "TEXT",
+}
+
+class JobStore:
+    """SQLite-backed persistent job queue shared by the API and the worker processes.
+
+    Every call opens its own short-lived connection, so a single store can be used
+    from multiple threads and each process simply creates its own instance.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB_PATH):
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self) -> None:
+        conn = self._connect()
+        try:
+            # WAL lets the API read job status while a worker holds the write lock
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in MIGRATIONS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def new_job_id() -> str:
+        return uuid.uuid4().hex
+
+    def create_job(
+        self, input_path: str, filename: str, settings: SubtitleConfig,
+        job_id: Optional[str] = None, transcript_key: Optional[str] = None
+    ) -> str:
+        """Queues a job. A `transcript_key` makes the worker reuse that cached transcript."""
+        job_id = job_id or self.new_job_id()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, status, filename, input_path, config, transcript_key, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, STATUS_QUEUED, filename, input_path, settings.model_dump_json(), transcript_key, time.time()),
+            )
+        finally:
+            conn.close()
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def claim_next(self, worker_id: str) -> Optional[dict]:
+        """Atomically moves the oldest queued job to running and returns it."""
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front so two workers can't claim the same row
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (STATUS_QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            started_at = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, started_at = ? WHERE id = ?",
+                (STATUS_RUNNING, worker_id, started_at, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        job = dict(row)
+        job.update(status=STATUS_RUNNING, worker_id=worker_id, started_at=started_at)
+        return job
+
+    def complete_job(self, job_id: str, output_path: str, transcript_key: Optional[str] = None) -> None:
+        self._finish(job_id, STATUS_DONE, output_path=output_path, transcript_key=transcript_key)
+
+    def fail_job(self, job_id: str, error: str) -> None:
+        self._finish(job_id, STATUS_FAILED, error=error)
+
+    def _finish(
+        self, job_id: str, status: str, output_path: Optional[str] = None,
+        error: Optional[str] = None, transcript_key: Optional[str] = None
+    ) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, output_path = ?, error = ?, finished_at = ?, "
+                "transcript_key = COALESCE(?, transcript_key) WHERE id = ?",
+                (status, output_path, error, time.time(), transcript_key, job_id),
+            )
+        finally:
+            conn.close()
+
+    def count_jobs(self, status: str) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def count_by_status(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        counts = dict.fromkeys((STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED), 0)
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+    def active_paths(self) -> List[str]:
+        """Inputs of queued and running jobs, which must outlive any retention policy."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT input_path FROM jobs WHERE status IN (?, ?)", (STATUS_QUEUED, STATUS_RUNNING)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [row[0] for row in rows]
+
+    def mean_run_seconds(self, recent: int = 20) -> Optional[float]:
+        """Average run time of the last `recent` finished jobs, or None without history."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT AVG(finished_at - started_at) FROM ("
+                "SELECT finished_at, started_at FROM jobs WHERE status = ? AND started_at IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT ?)",
+                (STATUS_DONE, recent),
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0]
+
+    def add_event(self, job_id: str, event_type: str, data: dict) -> int:
+        """Appends a progress event for the job and returns its (monotonic) event ID."""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO job_events (job_id, type, data, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, event_type, json.dumps(data), time.time()),
+            )
+        finally:
+            conn.close()
+        return cursor.lastrowid
+
+    def events_since(self, job_id: str, after_id: int = 0, limit: int = 500) -> List[dict]:
+        """Returns the job's events with an ID above `after_id`, oldest first. `data` stays JSON-encoded."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, type, data, created_at FROM job_events WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (job_id, after_id, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def purge_events(self, older_than_seconds: float) -> int:
+        """Deletes the events of jobs that finished more than `older_than_seconds` ago.
+
+        Event streams of those jobs then end with a terminal event rebuilt from the job row.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM job_events WHERE job_id IN ("
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?)",
+                (STATUS_DONE, STATUS_FAILED, time.time() - older_than_seconds),
+            )
+        finally:
+            conn.close()
+        if cursor.rowcount:
+            logger.info(f"Purged {cursor.rowcount} event(s) of finished jobs")
+        return cursor.rowcount
+
+    def requeue_orphans(self, worker_prefix: str, is_alive: Callable[[str], bool]) -> int:
+        """Puts running jobs whose worker (matching `worker_prefix`) has died back in the queue."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, worker_id FROM jobs WHERE status = ? AND worker_id LIKE ?",
+                (STATUS_RUNNING, f"{worker_prefix}%"),
+            ).fetchall()
+            orphans = [row["id"] for row in rows if not is_alive(row["worker_id"])]
+            for job_id in orphans:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = NULL, started_at = NULL WHERE id = ? AND status = ?",
+                    (STATUS_QUEUED, job_id, STATUS_RUNNING),
+                )
+        finally:
+            conn.close()
+        if orphans:
+            logger.warning(f"Requeued {len(orphans)} job(s) left running by dead workers")
+        return len(orphans)
@@ -1,90 +1,599 @@
 import os
-import shutil
+import math
+import time
 import json
+import asyncio
 import logging
+import threading
 import uvicorn
 from contextlib import asynccontextmanager
-from typing import Annotated
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import FileResponse
-from app.services import ModelManager, extract_audio, generate_subtitles, create_ass_file, burn_subtitles
-from app.schemas import SubtitleConfig
-from app.config import TEMP_DIR, AUDIO_DIR, ASS_DIR, OUTPUT_DIR
+from urllib.parse import quote
+from typing import Annotated, AsyncIterator, Callable, List, Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Header, Request
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from app.services import (
+    ModelManager, MediaInfo, TranscriptSegment, UnsupportedMediaError, InputTooLargeError, probe_media
+)
+from app.metrics import build_registry, observe_stage
+from app.metrics_dir import use_metrics_dir
+from app.pipeline import (
+    process_video, process_variants, primary_variant, write_bundle, inspect_input, preview_video, output_path_for,
+    transcript_cache
+)
+from app.cache import is_transcript_key
+from app.schemas import SubtitleConfig, PreviewConfig, JobStatus
+from app.artifacts import artifact_store, AREA_UPLOADS
+from app.config import (
+    WORKER_COUNT, EVENT_POLL_INTERVAL, EVENT_KEEPALIVE_SECONDS, JOB_CONCURRENCY,
+    MAX_QUEUED_JOBS, MAX_SYNC_REQUESTS, DEFAULT_RETRY_AFTER_SECONDS, PRELOAD_MODEL, WARMUP, MAX_INPUT_BYTES,
+    MAX_VARIANTS, STREAM_POLL_INTERVAL, SWEEP_INTERVAL_SECONDS,
+    EVENT_RETENTION_SECONDS
+)
+from app.jobs import JobStore, STATUS_QUEUED, STATUS_DONE, STATUS_FAILED, EVENT_DONE, EVENT_FAILED
+from app.worker import start_workers, stop_workers
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("uvicorn")
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup: Load Model
+job_store = JobStore()
+metrics_registry = None
+# In-flight /generate requests; each one runs a whole pipeline on the API's threadpool
+sync_slots = threading.BoundedSemaphore(MAX_SYNC_REQUESTS)
+# Set once the startup model is loaded (and warmed up); /readyz answers 503 until then
+model_ready = threading.Event()
+startup_error: Optional[str] = None
+
+def preload_model() -> None:
+    global startup_error
     logger.info("Startup: Pre-loading Whisper model...")
-    # Pre-load on GPU by default if available
     try:
-        ModelManager.load_model(use_gpu=True)
+        ModelManager.preload(warmup=WARMUP)
     except Exception as e:
         logger.warning(f"Startup model load failed: {e}")
+        startup_error = str(e)
+        return
+    model_ready.set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global metrics_registry
+    # Startup: Metrics
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR") and WORKER_COUNT > 0:
+        logger.warning("PROMETHEUS_MULTIPROC_DIR is not set: /metrics leaves out the workers (start the API with run.py)")
+    metrics_registry = build_registry(job_store)
+    # Startup: Job queue + worker pool
+    job_store.init_db()
+    workers, stop_event = start_workers(WORKER_COUNT) if WORKER_COUNT > 0 else ([], None)
+    # Startup: Retention sweeps; inputs of queued and running jobs are never removed
+    sweeper = artifact_store.start_sweeper(
+        job_store.active_paths, after_sweep=lambda: job_store.purge_events(EVENT_RETENTION_SECONDS)
+    ) if SWEEP_INTERVAL_SECONDS > 0 else None
+    # Startup: Load Model in the background so the server (and /healthz) is up right away
+    if PRELOAD_MODEL:
+        threading.Thread(target=preload_model, name="preload", daemon=True).start()
+    else:
+        model_ready.set()
     yield
     # Shutdown logic (if any)
     logger.info("Shutdown: Cleaning up...")
+    if workers:
+        stop_workers(workers, stop_event)
+    if sweeper:
+        sweeper[1].set()
 
 app = FastAPI(title="ScribeFlow API", lifespan=lifespan)
 
+def parse_config(config_json: str) -> SubtitleConfig:
+    try:
+        return SubtitleConfig(**json.loads(config_json))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid config_json: {e}")
+
+def parse_variants(configs_json: str) -> List[SubtitleConfig]:
+    try:
+        data = json.loads(configs_json)
+        if not isinstance(data, list) or not data:
+            raise ValueError("expected a non-empty JSON list of SubtitleConfig objects")
+        if len(data) > MAX_VARIANTS:
+            raise ValueError(f"at most {MAX_VARIANTS} variants per request")
+        return [SubtitleConfig(**item) for item in data]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid configs_json: {e}")
+
+def check_transcript_key(transcript_key: str) -> None:
+    if not is_transcript_key(transcript_key):
+        raise HTTPException(status_code=422, detail="Invalid transcript_key: expected 64 lowercase hex characters")
+
+def parse_preview(preview_json: str) -> PreviewConfig:
+    try:
+        return PreviewConfig(**json.loads(preview_json))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid preview_json: {e}")
+
+def save_upload(video: UploadFile, directory: str, base_name: str) -> str:
+    video_ext = os.path.splitext(video.filename)[1]
+    input_video_path = os.path.join(directory, f"{base_name}{video_ext}")
+    copied = 0
+    with observe_stage("upload"), open(input_video_path, "wb") as buffer:
+        # Stop copying as soon as the upload is over the limit
+        while chunk := video.file.read(1 << 20):
+            copied += len(chunk)
+            if MAX_INPUT_BYTES and copied > MAX_INPUT_BYTES:
+                break
+            buffer.write(chunk)
+    if MAX_INPUT_BYTES and copied > MAX_INPUT_BYTES:
+        os.remove(input_video_path)
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {MAX_INPUT_BYTES // 2**20} MB limit")
+    return input_video_path
+
+def check_input(input_video_path: str, settings: SubtitleConfig) -> Optional[MediaInfo]:
+    """Probes a saved upload; rejected inputs are deleted and answered with 413 or 415 before any processing."""
+    try:
+        return inspect_input(input_video_path, settings)
+    except UnsupportedMediaError as e:
+        os.remove(input_video_path)
+        raise HTTPException(status_code=413 if isinstance(e, InputTooLargeError) else 415, detail=str(e))
+
+def retry_after_seconds() -> int:
+    """Rough wait until a job slot frees up: recent mean run time spread over all job slots."""
+    mean_seconds = job_store.mean_run_seconds()
+    if mean_seconds is None:
+        return DEFAULT_RETRY_AFTER_SECONDS
+    return max(1, math.ceil(mean_seconds / (max(WORKER_COUNT, 1) * JOB_CONCURRENCY)))
+
+def admit_job() -> None:
+    """Rejects new jobs with 429 once the queue holds MAX_QUEUED_JOBS."""
+    if job_store.count_jobs(STATUS_QUEUED) >= MAX_QUEUED_JOBS:
+        raise HTTPException(
+            status_code=429, detail="Job queue is full", headers={"Retry-After": str(retry_after_seconds())}
+        )
+
+def acquire_sync_slot() -> None:
+    """Takes one of MAX_SYNC_REQUESTS pipeline slots, or rejects the request with 429."""
+    if not sync_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=429, detail="Too many /generate requests in progress; use POST /jobs or retry later",
+            headers={"Retry-After": str(DEFAULT_RETRY_AFTER_SECONDS)}
+        )
+
+def sync_request_slot():
+    """Holds a sync pipeline slot for the duration of the request."""
+    acquire_sync_slot()
+    try:
+        yield
+    finally:
+        sync_slots.release()
+
+# Output extension -> response media type, for every output_mode
+MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".mkv": "video/x-matroska",
+    ".ass": "text/x-ssa",
+    ".srt": "application/x-subrip",
+    ".vtt": "text/vtt",
+    ".json": "application/json",
+}
+
+def output_response(output_path: str, filename: str) -> FileResponse:
+    """Serves a pipeline output under the upload's name, with the output's own extension."""
+    ext = os.path.splitext(output_path)[1]
+    # Downloads count as use: the sweeper evicts outputs nobody fetched first
+    artifact_store.touch(output_path)
+    download_name = f"subbed_{os.path.splitext(filename)[0]}{ext}"
+    return FileResponse(output_path, media_type=MEDIA_TYPES.get(ext, "application/octet-stream"), filename=download_name)
+
+def attachment_header(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+# Bytes read from a growing output per iteration of a progressive download
+STREAM_CHUNK_BYTES = 1 << 16
+
+async def follow_file(path: str, is_finished: Callable[[], bool]) -> AsyncIterator[bytes]:
+    """Yields a file's bytes as they are written, until the writer is finished and all of it is sent.
+
+    Waits for new bytes on the event loop, so a slow client doesn't hold a threadpool
+    worker for the whole render; only the reads and `is_finished` checks use one, briefly.
+    """
+    while not os.path.exists(path):
+        if await run_in_threadpool(is_finished):
+            return
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+    f = open(path, "rb")
+    try:
+        while True:
+            # Checked before reading: an empty read after the writer finished means the end of the file
+            finished = await run_in_threadpool(is_finished)
+            data = await run_in_threadpool(f.read, STREAM_CHUNK_BYTES)
+            if data:
+                yield data
+            elif finished:
+                return
+            else:
+                await asyncio.sleep(STREAM_POLL_INTERVAL)
+    finally:
+        f.close()
+
+def job_status(job: dict) -> JobStatus:
+    result_url = f"/jobs/{job['id']}/result" if job["status"] == STATUS_DONE else None
+    return JobStatus(**job, result_url=result_url)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to ScribeFlow API. Go to /docs for the interface."}
 
-@app.post("/generate")
-async def generate_video(
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the server is up and answering."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 200 once the startup model is loaded, so traffic only reaches warm replicas."""
+    if model_ready.is_set():
+        return {"status": "ready"}
+    if startup_error is not None:
+        return JSONResponse({"status": "failed", "detail": startup_error}, status_code=503)
+    return JSONResponse({"status": "starting"}, status_code=503)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics of the API and all of its worker processes."""
+    return Response(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
+
+# Sync endpoint: FastAPI runs it in the threadpool, so the blocking pipeline
+# no longer stalls the event loop (and `/`, `/docs`, `/jobs`) while it runs.
+@app.post("/generate", dependencies=[Depends(sync_request_slot)])
+def generate_video(
     video: Annotated[UploadFile, File(description="Video file to process")],
     config_json: Annotated[str, Form(description="JSON string of SubtitleConfig")] = '{}'
 ):
     try:
         # Parse Config
-        config_data = json.loads(config_json)
-        settings = SubtitleConfig(**config_data)
-        
+        settings = parse_config(config_json)
+
         # unique ID for this request
-        timestamp = str(int(os.times().elapsed * 100)) # using simplified timestamp
-        base_name = f"req_{timestamp}"
-        
-        # Save uploaded video
-        video_ext = os.path.splitext(video.filename)[1]
-        input_video_path = os.path.join(TEMP_DIR, f"{base_name}{video_ext}")
-        
-        with open(input_video_path, "wb") as buffer:
-            shutil.copyfileobj(video.file, buffer)
-            
-        # Paths
-        audio_path = os.path.join(AUDIO_DIR, f"{base_name}.wav")
-        ass_path = os.path.join(ASS_DIR, f"{base_name}.ass")
-        output_video_path = os.path.join(OUTPUT_DIR, f"subbed_{base_name}.mp4")
-        
-        # 1. Extract Audio
-        extract_audio(input_video_path, audio_path)
-        
-        # 2. Transcribe
-        segments = generate_subtitles(audio_path, settings.lang, settings.use_gpu)
-        
-        # 3. Create ASS
-        create_ass_file(segments, ass_path, settings)
-        
-        # 4. Burn Subtitles
-        burn_subtitles(input_video_path, ass_path, output_video_path, settings.video_encoding_preset)
-        
-        # 5. Cleanup (Optional, removing temp video/audio)
-        if os.path.exists(input_video_path):
-            os.remove(input_video_path)
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
-            
-        return FileResponse(output_video_path, media_type="video/mp4", filename=f"subbed_{video.filename}")
+        base_name = f"req_{artifact_store.new_id()}"
 
+        # The upload lives in the request's workspace, removed however the request ends
+        with artifact_store.workspace() as work_dir:
+            input_video_path = save_upload(video, work_dir, "input")
+            media = check_input(input_video_path, settings)
+            output_video_path, _ = process_video(input_video_path, base_name, settings, media=media)
+
+        return output_response(output_video_path, video.filename)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Processing error: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate/stream")
+def generate_stream(
+    video: Annotated[UploadFile, File(description="Video file to process")],
+    config_json: Annotated[str, Form(description="JSON string of SubtitleConfig")] = '{}'
+):
+    """Like /generate, but streams the burned video while it is still being encoded.
+
+    The output is forced to fragmented 'burn' MP4. The response starts as soon as
+    rendering begins (after transcription) and grows with the encode, so players can
+    start before it finishes. An encode that fails midway ends the stream early.
+    """
+    settings = parse_config(config_json).model_copy(update={"output_mode": "burn", "fragmented": True})
+    acquire_sync_slot()
+    request_id = artifact_store.new_id()
+    work_dir = artifact_store.make_workspace()
+    try:
+        input_video_path = save_upload(video, work_dir, "input")
+        media = check_input(input_video_path, settings)
+    except BaseException:
+        artifact_store.remove_workspace(work_dir)
+        sync_slots.release()
+        raise
+
+    output_path = output_path_for(request_id, settings)
+    rendering = threading.Event()
+    finished = threading.Event()
+    errors = []
+
+    def on_progress(event_type: str, data: dict) -> None:
+        if event_type == "stage" and data.get("stage") == "rendering":
+            rendering.set()
+
+    def run() -> None:
+        try:
+            process_video(input_video_path, request_id, settings, on_progress=on_progress, media=media)
+        except Exception as e:
+            logger.error(f"Processing error: {e}")
+            errors.append(e)
+        finally:
+            artifact_store.remove_workspace(work_dir)
+            finished.set()
+            rendering.set()
+            sync_slots.release()
+
+    # The pipeline keeps the slot until it is done, even if the client goes away
+    threading.Thread(target=run, name=f"stream-{request_id}", daemon=True).start()
+    rendering.wait()
+    if errors:
+        raise HTTPException(status_code=500, detail=str(errors[0]))
+    download_name = f"subbed_{os.path.splitext(video.filename)[0]}.mp4"
+    return StreamingResponse(
+        follow_file(output_path, finished.is_set), media_type="video/mp4",
+        headers={"Content-Disposition": attachment_header(download_name)}
+    )
+
+@app.post("/generate/variants", dependencies=[Depends(sync_request_slot)])
+def generate_variants(
+    video: Annotated[UploadFile, File(description="Video file to process")],
+    configs_json: Annotated[str, Form(description="JSON list of SubtitleConfig, one per output")]
+):
+    """Renders several languages/styles of one video in a single pass and returns them as a zip.
+
+    Audio is extracted once, each language is transcribed once, and all burned
+    variants share one decode of the video. The zip holds one file per variant in
+    request order plus a manifest.json with each file's settings.
+    """
+    variants = parse_variants(configs_json)
+    request_id = artifact_store.new_id()
+    # Upload, variant outputs and bundle share one workspace, removed once the bundle is sent
+    work_dir = artifact_store.make_workspace()
+    bundle_path = os.path.join(work_dir, "bundle.zip")
+    try:
+        input_video_path = save_upload(video, work_dir, "input")
+        media = check_input(input_video_path, primary_variant(variants))
+        results = process_variants(input_video_path, request_id, variants, output_dir=work_dir, media=media)
+        write_bundle([output_path for output_path, _ in results], variants, bundle_path)
+    except HTTPException:
+        artifact_store.remove_workspace(work_dir)
+        raise
+    except Exception as e:
+        logger.error(f"Processing error: {e}")
+        artifact_store.remove_workspace(work_dir)
+        raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(
+        bundle_path, media_type="application/zip", filename=f"subbed_{os.path.splitext(video.filename)[0]}.zip",
+        background=BackgroundTask(artifact_store.remove_workspace, work_dir)
+    )
+
+@app.post("/jobs", response_model=JobStatus, status_code=202, dependencies=[Depends(admit_job)])
+def submit_job(
+    video: Annotated[UploadFile, File(description="Video file to process")],
+    config_json: Annotated[str, Form(description="JSON string of SubtitleConfig")] = '{}'
+):
+    """Queues a video for processing and returns immediately with the job ID."""
+    settings = parse_config(config_json)
+    job_id = job_store.new_job_id()
+    input_video_path = save_upload(video, artifact_store.path(AREA_UPLOADS), job_id)
+    check_input(input_video_path, settings)
+    job_store.create_job(input_video_path, video.filename, settings, job_id=job_id)
+    return job_status(job_store.get_job(job_id))
+
+@app.post("/jobs/{job_id}/restyle", response_model=JobStatus, status_code=202, dependencies=[Depends(admit_job)])
+def restyle_job(
+    job_id: str,
+    config_json: Annotated[str, Form(description="JSON string of SubtitleConfig")] = '{}'
+):
+    """Re-renders a finished job with new style settings, reusing its upload and cached transcript."""
+    settings = parse_config(config_json)
+    source = job_store.get_job(job_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if source["status"] != STATUS_DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {source['status']}")
+    if not os.path.exists(source["input_path"]):
+        raise HTTPException(status_code=410, detail="Source video is no longer available")
+    artifact_store.touch(source["input_path"])
+    new_job_id = job_store.create_job(
+        source["input_path"], source["filename"], settings, transcript_key=source["transcript_key"]
+    )
+    return job_status(job_store.get_job(new_job_id))
+
+@app.post("/restyle", response_model=JobStatus, status_code=202, dependencies=[Depends(admit_job)])
+def restyle_upload(
+    video: Annotated[UploadFile, File(description="Video the transcript was made from")],
+    transcript_key: Annotated[str, Form(description="transcript_key of an earlier job")],
+    config_json: Annotated[str, Form(description="JSON string of SubtitleConfig")] = '{}'
+):
+    """Renders an upload from a cached transcript, skipping audio extraction and transcription."""
+    settings = parse_config(config_json)
+    check_transcript_key(transcript_key)
+    if not transcript_cache.contains(transcript_key):
+        raise HTTPException(status_code=404, detail="Transcript not found in cache")
+    job_id = job_store.new_job_id()
+    input_video_path = save_upload(video, artifact_store.path(AREA_UPLOADS), job_id)
+    check_input(input_video_path, settings)
+    job_store.create_job(input_video_path, video.filename, settings, job_id=job_id, transcript_key=transcript_key)
+    return job_status(job_store.get_job(job_id))
+
+def preview_response(
+    work_dir: str, input_video_path: str, filename: str, segments: List[TranscriptSegment], settings: SubtitleConfig,
+    preview: PreviewConfig
+) -> FileResponse:
+    """Renders a preview into `work_dir` and serves it; the workspace is removed once the preview is sent."""
+    preview_id = artifact_store.new_id()
+    output_path = os.path.join(work_dir, f"preview_{preview_id}.mp4")
+    try:
+        media = probe_media(input_video_path)
+        if media is not None and not media.has_video:
+            raise UnsupportedMediaError("The input has no video stream to preview")
+        preview_video(input_video_path, preview_id, segments, settings, preview, output_path, media)
+    except UnsupportedMediaError as e:
+        artifact_store.remove_workspace(work_dir)
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        artifact_store.remove_workspace(work_dir)
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Preview error: {e}")
+        artifact_store.remove_workspace(work_dir)
+        raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(
+        output_path, media_type="video/mp4", filename=f"preview_{os.path.splitext(filename)[0]}.mp4",
+        background=BackgroundTask(artifact_store.remove_workspace, work_dir)
+    )
+
+# Previews wait for an ffmpeg slot on the API's threadpool, so they share the /generate admission limit
+@app.post("/jobs/{job_id}/preview", dependencies=[Depends(sync_request_slot)])
+def preview_job(
+    job_id: str,
+    config_json: Annotated[str, Form(description="JSON string of SubtitleConfig")] = '{}',
+    preview_json: Annotated[str, Form(description="JSON string of PreviewConfig")] = '{}'
+):
+    """Returns a quick low-resolution render of new style settings over parts of a finished job's video.
+
+    Reuses the job's upload and cached transcript, and encodes only the preview
+    windows, so styles can be tried in seconds before a full /restyle.
+    """
+    settings = parse_config(config_json)
+    preview = parse_preview(preview_json)
+    source = job_store.get_job(job_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if source["status"] != STATUS_DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {source['status']}")
+    if not os.path.exists(source["input_path"]):
+        raise HTTPException(status_code=410, detail="Source video is no longer available")
+    segments = transcript_cache.get(source["transcript_key"]) if source["transcript_key"] else None
+    if segments is None:
+        raise HTTPException(status_code=410, detail="Transcript is no longer cached; restyle the job to rebuild it")
+    artifact_store.touch(source["input_path"])
+    return preview_response(
+        artifact_store.make_workspace(), source["input_path"], source["filename"], segments, settings, preview
+    )
+
+@app.post("/preview", dependencies=[Depends(sync_request_slot)])
+def preview_upload(
+    video: Annotated[UploadFile, File(description="Video the transcript was made from")],
+    transcript_key: Annotated[str, Form(description="transcript_key of an earlier job")],
+    config_json: Annotated[str, Form(description="JSON string of SubtitleConfig")] = '{}',
+    preview_json: Annotated[str, Form(description="JSON string of PreviewConfig")] = '{}'
+):
+    """Like /jobs/{job_id}/preview, for an upload plus the transcript_key of an earlier job."""
+    settings = parse_config(config_json)
+    preview = parse_preview(preview_json)
+    check_transcript_key(transcript_key)
+    segments = transcript_cache.get(transcript_key)
+    if segments is None:
+        raise HTTPException(status_code=404, detail="Transcript not found in cache")
+    # The upload shares the preview's workspace and is removed with it
+    work_dir = artifact_store.make_workspace()
+    try:
+        input_video_path = save_upload(video, work_dir, "input")
+    except BaseException:
+        artifact_store.remove_workspace(work_dir)
+        raise
+    return preview_response(work_dir, input_video_path, video.filename, segments, settings, preview)
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+def sse_message(event_id: int, event_type: str, data: str) -> str:
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    request: Request,
+    last_event_id: Annotated[Optional[str], Header(description="Resume after this event ID (sent by EventSource on reconnect)")] = None
+):
+    """Server-Sent Events stream of a job's progress.
+
+    Events: `stage` (extracting / transcribing / rendering), `segment` (each transcript
+    segment with start, end, text and percent of the media, as soon as it is decoded),
+    `progress` (burn frame, seconds and percent), then a final `done` or `failed`.
+    """
+    job = await run_in_threadpool(job_store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        after_id = int(last_event_id or 0)
+    except ValueError:
+        after_id = 0
+
+    async def event_stream():
+        nonlocal after_id
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            events = await run_in_threadpool(job_store.events_since, job_id, after_id)
+            for event in events:
+                after_id = event["id"]
+                yield sse_message(event["id"], event["type"], event["data"])
+                if event["type"] in (EVENT_DONE, EVENT_FAILED):
+                    return
+            if events:
+                last_sent = time.monotonic()
+                continue
+            # A job can finish without a terminal event (e.g. it ran before events were recorded)
+            current = await run_in_threadpool(job_store.get_job, job_id)
+            if current["status"] in (STATUS_DONE, STATUS_FAILED):
+                if not await run_in_threadpool(job_store.events_since, job_id, after_id):
+                    if current["status"] == STATUS_DONE:
+                        yield sse_message(after_id, EVENT_DONE, json.dumps({"transcript_key": current["transcript_key"]}))
+                    else:
+                        yield sse_message(after_id, EVENT_FAILED, json.dumps({"error": current["error"]}))
+                    return
+                continue
+            if time.monotonic() - last_sent >= EVENT_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != STATUS_DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if not os.path.exists(job["output_path"]):
+        raise HTTPException(status_code=410, detail="Job output is no longer available")
+    return output_response(job["output_path"], job["filename"])
+
+@app.get("/jobs/{job_id}/stream")
+def stream_job_result(job_id: str):
+    """Streams a job's output: the growing file while a `fragmented` burn job is queued or
+    running, the finished file (with Range support) once it is done."""
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == STATUS_DONE:
+        return get_job_result(job_id)
+    if job["status"] == STATUS_FAILED:
+        raise HTTPException(status_code=409, detail="Job failed")
+    settings = SubtitleConfig.model_validate_json(job["config"])
+    if settings.output_mode != "burn" or not settings.fragmented:
+        raise HTTPException(
+            status_code=409, detail="Only fragmented burn jobs stream while running; wait for /jobs/{job_id}/result"
+        )
+
+    def is_finished() -> bool:
+        return job_store.get_job(job_id)["status"] in (STATUS_DONE, STATUS_FAILED)
+
+    download_name = f"subbed_{os.path.splitext(job['filename'])[0]}.mp4"
+    return StreamingResponse(
+        follow_file(output_path_for(job_id, settings), is_finished), media_type="video/mp4",
+        headers={"Content-Disposition": attachment_header(download_name)}
+    )
+
 if __name__ == "__main__":
+    # The server runs in uvicorn's reloader subprocess, which imports the app with this set
+    use_metrics_dir()
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,83 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+# Jobs run in worker processes, so the API and its workers use prometheus_client's
+# multiprocess mode: every process writes its own files and /metrics merges them. It is
+# on when PROMETHEUS_MULTIPROC_DIR is set before prometheus_client is imported (run.py
+# sets it, see app.metrics_dir). Without it (batch CLI, benchmarks) metrics stay in memory.
+
+# Seconds; covers a sub-second ASS write up to an hour-long burn
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+# Processing seconds per media second
+RTF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10)
+# 1 MB .. 10 GB
+SIZE_BUCKETS = (1e6, 5e6, 1e7, 5e7, 1e8, 2.5e8, 5e8, 1e9, 2.5e9, 5e9, 1e10)
+
+STAGE_SECONDS = Histogram(
+    "subit_stage_seconds", "Wall time of each pipeline stage", ["stage"], buckets=STAGE_BUCKETS
+)
+REALTIME_FACTOR = Histogram(
+    "subit_realtime_factor", "Processing seconds per second of media", ["stage"], buckets=RTF_BUCKETS
+)
+INPUT_SIZE_BYTES = Histogram("subit_input_size_bytes", "Size of processed inputs", buckets=SIZE_BUCKETS)
+MEDIA_SECONDS = Counter("subit_media_seconds", "Seconds of media processed")
+INPUT_BYTES = Counter("subit_input_bytes", "Bytes of input media processed")
+OUTPUT_BYTES = Counter("subit_output_bytes", "Bytes of output produced")
+MODEL_REQUESTS = Counter(
+    "subit_model_requests", "Model registry lookups, by whether the model was already loaded", ["result"]
+)
+TRANSCRIPT_CACHE_REQUESTS = Counter(
+    "subit_transcript_cache_requests", "Transcript cache lookups", ["result"]
+)
+ARTIFACT_EVICTIONS = Counter(
+    "subit_artifact_evictions", "Artifacts removed by the sweeper, by area and reason (expired / quota)", ["area", "reason"]
+)
+FFMPEG_CPU_SECONDS = Counter(
+    "subit_ffmpeg_cpu_seconds", "CPU time used by ffmpeg processes", ["stage", "mode"]
+)
+
+@contextmanager
+def observe_stage(stage: str) -> Iterator[None]:
+    """Records the block's wall time in subit_stage_seconds (failed attempts included)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+def observe_realtime_factor(stage: str, seconds: float, media_seconds: Optional[float]) -> None:
+    if media_seconds:
+        REALTIME_FACTOR.labels(stage).observe(seconds / media_seconds)
+
+def record_ffmpeg_cpu(stage: str, user_seconds: float, system_seconds: float) -> None:
+    FFMPEG_CPU_SECONDS.labels(stage, "user").inc(user_seconds)
+    FFMPEG_CPU_SECONDS.labels(stage, "system").inc(system_seconds)
+
+class JobQueueCollector:
+    """Reports job counts by status straight from the job database at scrape time."""
+
+    def __init__(self, job_store):
+        self.job_store = job_store
+
+    def collect(self):
+        gauge = GaugeMetricFamily("subit_jobs", "Jobs by status (running = active)", labels=["status"])
+        for status, count in self.job_store.count_by_status().items():
+            gauge.add_metric([status], count)
+        yield gauge
+
+def build_registry(job_store) -> CollectorRegistry:
+    """Registry for /metrics: metrics of every process plus the job queue gauges.
+
+    Outside multiprocess mode only this process's metrics are available.
+    """
+    registry = CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+    registry.register(JobQueueCollector(job_store))
+    return registry
@@ -0,0 +1,32 @@
+import os
+import shutil
+from app.config import METRICS_DIR
+
+# prometheus_client chooses between in-memory and file-backed (multiprocess) metric values
+# when it is first imported, so entrypoints call use_metrics_dir() before importing the app.
+# This module must not import prometheus_client itself.
+
+def _remove_stale_dirs() -> None:
+    """Removes the metric directories of API processes that are gone (they hold stale values)."""
+    for name in os.listdir(METRICS_DIR):
+        if name.isdigit() and int(name) != os.getpid():
+            try:
+                os.kill(int(name), 0)
+            except ProcessLookupError:
+                shutil.rmtree(os.path.join(METRICS_DIR, name), ignore_errors=True)
+            except PermissionError:
+                pass
+
+def use_metrics_dir() -> str:
+    """Points PROMETHEUS_MULTIPROC_DIR at a fresh directory for this run unless it is set; returns it.
+
+    The API's workers inherit it through the environment, and /metrics merges the
+    files of every process. Set it yourself to share one directory with workers
+    started separately via `python -m app.worker`.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        _remove_stale_dirs()
+        directory = os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(METRICS_DIR, str(os.getpid()))
+    os.makedirs(directory, exist_ok=True)
+    return directory
@@ -0,0 +1,136 @@
+import os
+import atexit
+import logging
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple, Union
+from app.services import ModelManager, TranscriptSegment, TranscriptWord, SAMPLE_RATE
+from app.config import PARALLEL_WORKERS, PARALLEL_CHUNK_SECONDS, DEFAULT_MODEL_SIZE, WORD_TIMESTAMPS
+
+logger = logging.getLogger("uvicorn")
+
+# Silence longer than this between speech regions always closes the current chunk,
+# so long pauses are never sent to the model
+MAX_CHUNK_GAP_SECONDS = 2.0
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+# CTranslate2 threads for this pool worker, set by the pool initializer
+_worker_cpu_threads = 0
+
+def _init_worker(cpu_threads: int) -> None:
+    global _worker_cpu_threads
+    _worker_cpu_threads = cpu_threads
+
+def _transcribe_chunk(samples: np.ndarray, offset: float, lang: str, model_size: str) -> List[TranscriptSegment]:
+    # Each pool worker keeps its own ModelManager registry, so models stay loaded between chunks
+    model = ModelManager.load_model(use_gpu=False, model_size=model_size, cpu_threads=_worker_cpu_threads)
+    segments, _ = model.transcribe(samples, language=lang, word_timestamps=WORD_TIMESTAMPS)
+    results = []
+    for segment in segments:
+        # Shift chunk-local timestamps back onto the full-length timeline
+        result = TranscriptSegment.from_segment(segment)
+        result.start += offset
+        result.end += offset
+        if result.words:
+            result.words = [TranscriptWord(w.start + offset, w.end + offset, w.word, w.probability) for w in result.words]
+        results.append(result)
+    return results
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Returns the process pool of `workers` processes, created on first use so the processes persist.
+
+    Asking for a different size replaces the pool; chunks already submitted to the old
+    one still run, and its processes exit once they are done.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None and _executor_workers != workers:
+            logger.info(f"Resizing the transcription pool from {_executor_workers} to {workers} worker(s)")
+            _executor.shutdown(wait=False)
+            _executor = None
+        if _executor is None:
+            # Split the cores between workers instead of letting each one grab all of them
+            cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+            logger.info(f"Starting {workers} transcription worker(s) with {cpu_threads} CPU thread(s) each")
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(cpu_threads,),
+            )
+            _executor_workers = workers
+            atexit.register(_executor.shutdown, cancel_futures=True)
+        return _executor
+
+def warm_pool(workers: int = PARALLEL_WORKERS, model_size: str = DEFAULT_MODEL_SIZE) -> None:
+    """Starts every pool worker and loads its model ahead of the first real request."""
+    executor = _get_executor(workers)
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    for future in [executor.submit(_transcribe_chunk, silence, 0.0, "en", model_size) for _ in range(workers)]:
+        future.result()
+
+def plan_chunks(audio: np.ndarray, chunk_seconds: float = PARALLEL_CHUNK_SECONDS) -> List[Tuple[int, int]]:
+    """Groups VAD speech regions into (start, end) sample ranges of at most ~chunk_seconds.
+
+    Boundaries always fall in silence, and audio with no detected speech is dropped.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    vad_options = VadOptions(min_silence_duration_ms=500, max_speech_duration_s=chunk_seconds)
+    speech = get_speech_timestamps(audio, vad_options, sampling_rate=SAMPLE_RATE)
+
+    max_chunk = int(chunk_seconds * SAMPLE_RATE)
+    max_gap = int(MAX_CHUNK_GAP_SECONDS * SAMPLE_RATE)
+    chunks = []
+    for region in speech:
+        if chunks:
+            start, end = chunks[-1]
+            if region["end"] - start <= max_chunk and region["start"] - end <= max_gap:
+                chunks[-1] = (start, region["end"])
+                continue
+        chunks.append((region["start"], region["end"]))
+    return chunks
+
+def stream_parallel(
+    audio: Union[str, np.ndarray], lang: str, model_size: str = DEFAULT_MODEL_SIZE, workers: int = PARALLEL_WORKERS
+) -> Iterator[TranscriptSegment]:
+    """Transcribes speech chunks concurrently on a CPU process pool, yielding segments in order.
+
+    Every chunk is submitted up front; each chunk's segments are yielded as soon as it
+    and all chunks before it are done.
+    """
+    if isinstance(audio, str):
+        from faster_whisper import decode_audio
+        audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+
+    chunks = plan_chunks(audio)
+    speech_seconds = sum(end - start for start, end in chunks) / SAMPLE_RATE
+    logger.info(
+        f"VAD: {len(chunks)} chunk(s), {speech_seconds:.1f}s of speech in {len(audio) / SAMPLE_RATE:.1f}s of audio"
+    )
+    if not chunks:
+        return
+
+    executor = _get_executor(workers)
+    futures = [
+        executor.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, lang, model_size)
+        for start, end in chunks
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        # A consumer that stops early (or a failed chunk) shouldn't leave the pool busy
+        for future in futures:
+            future.cancel()
+
+def transcribe_parallel(
+    audio: Union[str, np.ndarray], lang: str, model_size: str = DEFAULT_MODEL_SIZE, workers: int = PARALLEL_WORKERS
+) -> List[TranscriptSegment]:
+    """Transcribes speech chunks concurrently on a CPU process pool and merges them in order."""
+    return list(stream_parallel(audio, lang, model_size, workers))
@@ -0,0 +1,431 @@
+import os
+import logging
+import time
+import json
+import zipfile
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from app.services import (
+    ModelManager, TranscriptSegment, ProgressCallback, MediaInfo, UnsupportedMediaError, InputTooLargeError, SAMPLE_RATE,
+    extract_audio, extract_audio_array, probe_media, is_silent, stream_subtitles, create_ass_file, burn_subtitles,
+    burn_subtitles_segmented, burn_subtitles_multi, mux_soft_subtitles, copy_streams, encoder_threads, render_preview
+)
+from app.formats import SUBTITLE_WRITERS
+from app.cache import TranscriptCache, transcript_key
+from app.parallel import stream_parallel
+from app.scheduler import scheduler, STAGE_INFERENCE, STAGE_FFMPEG
+from app.artifacts import artifact_store, AREA_TRANSCRIPTS
+from app.metrics import INPUT_BYTES, INPUT_SIZE_BYTES, MEDIA_SECONDS, OUTPUT_BYTES, observe_stage, observe_realtime_factor
+from app.schemas import SubtitleConfig, PreviewConfig
+from app.config import (
+    AUDIO_DIR, OUTPUT_DIR, KEEP_AUDIO_WAV, BATCHED_INFERENCE, MAX_INPUT_BYTES, MAX_INPUT_SECONDS,
+    MAX_INPUT_PIXELS, RENDER_MAX_HEIGHT, WORD_TIMESTAMPS
+)
+
+logger = logging.getLogger("uvicorn")
+
+# Cached transcripts live in the artifact store's transcripts area, under its retention policy
+transcript_cache = TranscriptCache(artifact_store, AREA_TRANSCRIPTS)
+
+def _ignore_progress(event_type: str, data: dict) -> None:
+    pass
+
+def segment_event(segment: TranscriptSegment, duration: Optional[float]) -> dict:
+    percent = round(min(100.0, 100 * segment.end / duration), 1) if duration else None
+    return {"start": round(segment.start, 3), "end": round(segment.end, 3), "text": segment.text.strip(), "percent": percent}
+
+def throttled_progress(on_progress: ProgressCallback, step: float = 1.0) -> ProgressCallback:
+    """Passes on "progress" events only when the percent has moved by `step` (or reached 100).
+
+    ffmpeg reports about twice a second; without a known duration (no percent), one
+    report per `step` * 10 seconds of media is kept instead. Other events pass unchanged.
+    """
+    last = {"percent": None, "seconds": None}
+
+    def report(event_type: str, data: dict) -> None:
+        if event_type == "progress":
+            percent, seconds = data.get("percent"), data.get("seconds", 0.0)
+            if percent is not None:
+                if percent < 100 and last["percent"] is not None and percent - last["percent"] < step:
+                    return
+                last["percent"] = percent
+            else:
+                if last["seconds"] is not None and seconds - last["seconds"] < step * 10:
+                    return
+                last["seconds"] = seconds
+        on_progress(event_type, data)
+
+    return report
+
+def waiting_reporter(on_progress: ProgressCallback) -> Callable[[str], None]:
+    """Reports a "waiting" stage when a job has to queue for a scheduler slot."""
+    return lambda stage: on_progress("stage", {"stage": "waiting", "slot": stage})
+
+def inspect_input(input_video_path: str, settings: SubtitleConfig) -> Optional[MediaInfo]:
+    """Probes the input once and rejects it before any decoding if it can't or shouldn't be processed.
+
+    Raises InputTooLargeError past the size, duration or resolution limits and
+    UnsupportedMediaError for unreadable inputs or a missing stream the output needs.
+    Returns None when ffprobe isn't installed; only the size limit applies then.
+    """
+    size = os.path.getsize(input_video_path)
+    if MAX_INPUT_BYTES and size > MAX_INPUT_BYTES:
+        raise InputTooLargeError(f"Input is {size / 2**20:.0f} MB, the limit is {MAX_INPUT_BYTES / 2**20:.0f} MB")
+    media = probe_media(input_video_path)
+    if media is None:
+        return None
+    if not media.has_video and not media.has_audio:
+        raise UnsupportedMediaError("Input has no audio or video stream")
+    if not media.has_video and settings.output_mode not in SUBTITLE_WRITERS:
+        raise UnsupportedMediaError(f"output_mode '{settings.output_mode}' needs a video stream; the input has none")
+    if MAX_INPUT_SECONDS and media.duration and media.duration > MAX_INPUT_SECONDS:
+        raise InputTooLargeError(f"Input is {media.duration:.0f}s long, the limit is {MAX_INPUT_SECONDS:.0f}s")
+    if MAX_INPUT_PIXELS and media.width * media.height > MAX_INPUT_PIXELS:
+        raise InputTooLargeError(f"Input resolution {media.width}x{media.height} exceeds the {MAX_INPUT_PIXELS} pixel limit")
+    return media
+
+def load_audio(
+    input_video_path: str, base_name: str, on_progress: ProgressCallback = _ignore_progress,
+    media: Optional[MediaInfo] = None
+) -> Union[str, np.ndarray, None]:
+    """Extracts the audio once for any number of transcriptions; None when the input has no audio.
+
+    Audio that is already 16 kHz mono PCM (per `media`) is stream-copied instead of resampled.
+    """
+    if media is not None and not media.has_audio:
+        logger.info("Input has no audio stream, skipping extraction and transcription")
+        return None
+    copy_audio = media is not None and media.audio_is_whisper_pcm
+    # 1. Extract Audio (in memory; the on-disk WAV is a debug option)
+    with scheduler.slot(STAGE_FFMPEG, waiting_reporter(on_progress)), observe_stage("extract_audio"):
+        on_progress("stage", {"stage": "extracting"})
+        start = time.perf_counter()
+        if KEEP_AUDIO_WAV:
+            audio = os.path.join(AUDIO_DIR, f"{base_name}.wav")
+            extract_audio(input_video_path, audio, copy_audio)
+            logger.info(f"Debug WAV kept at {audio}")
+        else:
+            audio = extract_audio_array(input_video_path, media.duration if media else None, copy_audio)
+    logger.info(f"Audio extraction took {time.perf_counter() - start:.2f}s")
+    return audio
+
+def transcribe_audio(
+    audio: Union[str, np.ndarray, None], settings: SubtitleConfig, on_progress: ProgressCallback = _ignore_progress,
+    media: Optional[MediaInfo] = None
+) -> Tuple[str, List[TranscriptSegment]]:
+    """Returns (transcript_key, segments) for extracted audio, skipping the model on a cache hit.
+
+    Each segment is reported through `on_progress` as soon as the model yields it.
+    Missing (None) and silent audio get an empty transcript without running the model.
+    """
+    parallel = settings.transcription_mode == "parallel"
+    # The parallel pool always runs on CPU
+    compute_type = ModelManager.compute_type_for(settings.use_gpu and not parallel)
+    # Batched decoding differs from the sequential pass, so it gets its own cache entries
+    mode = "batched" if BATCHED_INFERENCE and not parallel else settings.transcription_mode
+    # The batched engine decodes without timestamps, so only the other modes get word timings
+    if WORD_TIMESTAMPS and mode != "batched":
+        mode = f"{mode}+words"
+
+    if audio is None:
+        # Every audio-less input has the same (empty) transcript
+        key = transcript_key(np.zeros(0, dtype=np.float32), settings.lang, settings.model_size, compute_type, mode)
+        on_progress("stage", {"stage": "transcribing", "cached": False, "duration": media.duration if media else None})
+        transcript_cache.put(key, [])
+        return key, []
+
+    key = transcript_key(audio, settings.lang, settings.model_size, compute_type, mode)
+    segments = transcript_cache.get(key)
+    duration = len(audio) / SAMPLE_RATE if not isinstance(audio, str) else (media.duration if media else None)
+    on_progress("stage", {"stage": "transcribing", "cached": segments is not None, "duration": duration})
+    if segments is not None:
+        for segment in segments:
+            on_progress("segment", segment_event(segment, duration))
+        return key, segments
+    if not isinstance(audio, str) and is_silent(audio):
+        logger.info("Audio is silent, skipping transcription")
+        transcript_cache.put(key, [])
+        return key, []
+
+    # 2. Transcribe
+    with scheduler.slot(STAGE_INFERENCE, waiting_reporter(on_progress)), observe_stage("transcribe"):
+        start = time.perf_counter()
+        if parallel:
+            stream = stream_parallel(audio, settings.lang, settings.model_size)
+        else:
+            stream = stream_subtitles(audio, settings.lang, settings.use_gpu, settings.model_size)
+        segments = []
+        for raw in stream:
+            segment = TranscriptSegment.from_segment(raw)
+            segments.append(segment)
+            on_progress("segment", segment_event(segment, duration))
+    elapsed = time.perf_counter() - start
+    logger.info(f"Transcription ({mode}) took {elapsed:.2f}s")
+    observe_realtime_factor("transcribe", elapsed, duration)
+    transcript_cache.put(key, segments)
+    return key, segments
+
+def transcribe_cached(
+    input_video_path: str, base_name: str, settings: SubtitleConfig, on_progress: ProgressCallback = _ignore_progress,
+    media: Optional[MediaInfo] = None
+) -> Tuple[str, List[TranscriptSegment]]:
+    """Extracts audio and returns (transcript_key, segments), skipping the model on a cache hit.
+
+    With probe results in `media`, inputs without audio skip extraction, audio that
+    is already 16 kHz mono PCM is stream-copied, and silent audio skips the model.
+    """
+    audio = load_audio(input_video_path, base_name, on_progress, media)
+    return transcribe_audio(audio, settings, on_progress, media)
+
+def output_path_for(base_name: str, settings: SubtitleConfig, output_dir: str = OUTPUT_DIR) -> str:
+    """Where render_video writes the output for `base_name` under these settings."""
+    if settings.output_mode in SUBTITLE_WRITERS:
+        return os.path.join(output_dir, f"{base_name}.{settings.output_mode}")
+    container = settings.output_container if settings.output_mode == "soft" else "mp4"
+    return os.path.join(output_dir, f"subbed_{base_name}.{container}")
+
+def render_scale_height(media: Optional[MediaInfo]) -> int:
+    """Height burns scale down to (0 = keep the input size)."""
+    return RENDER_MAX_HEIGHT if media and RENDER_MAX_HEIGHT and media.height > RENDER_MAX_HEIGHT else 0
+
+def render_video(
+    input_video_path: str, base_name: str, segments: List[TranscriptSegment], settings: SubtitleConfig,
+    on_progress: ProgressCallback = _ignore_progress, output_dir: str = OUTPUT_DIR, media: Optional[MediaInfo] = None
+) -> str:
+    """Styles an existing transcript into the requested output; returns the output path.
+
+    Only 'burn' re-encodes video, and only when there is something to burn: an empty
+    transcript is stream-copied. 'soft' copies the streams and adds a subtitle track,
+    and the subtitle-only modes never touch the video at all. With probe results in
+    `media`, burns size their encoder threads to the resolution and are scaled down to
+    RENDER_MAX_HEIGHT when taller.
+    """
+    on_wait = waiting_reporter(on_progress)
+    on_progress("stage", {"stage": "rendering", "output_mode": settings.output_mode})
+    output_path = output_path_for(base_name, settings, output_dir)
+    if settings.output_mode in SUBTITLE_WRITERS:
+        with observe_stage("write_subtitles"):
+            SUBTITLE_WRITERS[settings.output_mode](segments, output_path, settings)
+        return output_path
+
+    # The ASS file is an intermediate: it lives in a workspace removed once the output is written
+    with artifact_store.workspace() as work_dir:
+        ass_path = os.path.join(work_dir, f"{base_name}.ass")
+
+        # 3. Create ASS
+        with observe_stage("create_ass"):
+            create_ass_file(segments, ass_path, settings)
+
+        if settings.output_mode == "soft":
+            with scheduler.slot(STAGE_FFMPEG, on_wait), observe_stage("mux"):
+                mux_soft_subtitles(input_video_path, ass_path, output_path, settings.output_container, settings.lang)
+            return output_path
+
+        scale_height = render_scale_height(media)
+        if not segments and not scale_height:
+            # Nothing to draw: copy the streams instead of re-encoding identical frames
+            try:
+                with scheduler.slot(STAGE_FFMPEG, on_wait), observe_stage("copy"):
+                    copy_streams(input_video_path, output_path, settings.fragmented)
+                return output_path
+            except RuntimeError:
+                logger.info("Input streams can't be copied into MP4, re-encoding instead")
+
+        # 4. Burn Subtitles
+        def on_burn_progress(report: dict) -> None:
+            on_progress("progress", {"stage": "burning", **report})
+
+        duration = media.duration if media else None
+        threads = encoder_threads(scale_height or media.height) if media else 0
+        # A segmented burn still takes one slot: its processes split the cores a single burn would use
+        with scheduler.slot(STAGE_FFMPEG, on_wait), observe_stage("burn"):
+            # Segments are only joined at the end, so a fragmented (streamable) output needs a single process
+            if settings.render_parallelism > 1 and not settings.fragmented:
+                burn_subtitles_segmented(
+                    input_video_path, ass_path, output_path, settings.video_encoding_preset, settings.render_parallelism,
+                    on_burn_progress, duration, scale_height, threads
+                )
+            else:
+                burn_subtitles(
+                    input_video_path, ass_path, output_path, settings.video_encoding_preset, on_burn_progress,
+                    duration, threads, scale_height, settings.fragmented
+                )
+
+    return output_path
+
+def preview_windows(
+    segments: List[TranscriptSegment], preview: PreviewConfig, duration: Optional[float]
+) -> List[Tuple[float, float]]:
+    """The (start, end) ranges a preview shows, in order and non-overlapping.
+
+    An explicit `start` gives one window. Otherwise `clips` clips start just before
+    transcript segments picked evenly across the video, so every clip has subtitles
+    on screen; without a transcript they are spread evenly over the duration.
+    """
+    if preview.start is not None:
+        if duration and preview.start >= duration:
+            raise ValueError(f"Preview start {preview.start}s is past the end of the video ({duration:.1f}s)")
+        end = preview.start + preview.duration
+        return [(preview.start, min(end, duration) if duration else end)]
+
+    if segments:
+        count = min(preview.clips, len(segments))
+        picks = [segments[round(i * (len(segments) - 1) / max(count - 1, 1))] for i in range(count)]
+        # A little lead-in so the first subtitle doesn't appear on the very first frame
+        starts = [max(0.0, segment.start - 0.25) for segment in picks]
+    elif duration:
+        step = duration / preview.clips
+        starts = [i * step for i in range(preview.clips)]
+    else:
+        starts = [0.0]
+
+    windows: List[Tuple[float, float]] = []
+    for start in sorted(starts):
+        if windows and start < windows[-1][1]:
+            continue
+        end = start + preview.clip_seconds
+        windows.append((start, min(end, duration) if duration else end))
+    return [(start, end) for start, end in windows if end > start]
+
+def preview_video(
+    input_video_path: str, base_name: str, segments: List[TranscriptSegment], settings: SubtitleConfig,
+    preview: PreviewConfig, output_path: str, media: Optional[MediaInfo] = None
+) -> str:
+    """Burns a low-resolution preview of `settings` over parts of the video; returns the output path.
+
+    Meant for style iteration: the transcript comes from the cache, and only the
+    preview windows are decoded and encoded.
+    """
+    windows = preview_windows(segments, preview, media.duration if media else None)
+    with artifact_store.workspace() as work_dir:
+        ass_path = os.path.join(work_dir, f"{base_name}.ass")
+        with observe_stage("create_ass"):
+            create_ass_file(segments, ass_path, settings)
+        with scheduler.slot(STAGE_FFMPEG), observe_stage("preview"):
+            render_preview(
+                input_video_path, ass_path, output_path, windows, preview.height, preview.fps,
+                has_audio=media.has_audio if media else True
+            )
+    return output_path
+
+def process_video(
+    input_video_path: str, base_name: str, settings: SubtitleConfig, cached_key: Optional[str] = None,
+    on_progress: ProgressCallback = _ignore_progress, output_dir: str = OUTPUT_DIR, media: Optional[MediaInfo] = None
+) -> Tuple[str, str]:
+    """Runs the full probe -> extract -> transcribe -> ASS -> burn pipeline.
+
+    Returns (output_path, transcript_key). When `cached_key` names a transcript that is
+    still cached (a restyle), extraction and transcription are skipped entirely.
+    Stage changes, transcript segments and burn progress are reported through `on_progress`.
+    `media` is the result of an earlier inspect_input; without it the input is probed
+    (and possibly rejected) here.
+
+    This is blocking (ffmpeg subprocesses + model inference), so callers must run it
+    off the event loop: in a worker process or a threadpool.
+    """
+    start = time.perf_counter()
+    if media is None:
+        media = inspect_input(input_video_path, settings)
+    media_seconds = media.duration if media else None
+    input_bytes = os.path.getsize(input_video_path)
+    INPUT_BYTES.inc(input_bytes)
+    INPUT_SIZE_BYTES.observe(input_bytes)
+
+    segments = transcript_cache.get(cached_key) if cached_key else None
+    if segments is None:
+        if cached_key:
+            logger.info(f"Transcript {cached_key} no longer cached, transcribing again")
+        cached_key, segments = transcribe_cached(input_video_path, base_name, settings, on_progress, media)
+
+    render_start = time.perf_counter()
+    output_path = render_video(input_video_path, base_name, segments, settings, on_progress, output_dir, media)
+    end = time.perf_counter()
+    observe_realtime_factor("render", end - render_start, media_seconds)
+    observe_realtime_factor("total", end - start, media_seconds)
+    if media_seconds:
+        MEDIA_SECONDS.inc(media_seconds)
+    OUTPUT_BYTES.inc(os.path.getsize(output_path))
+    return output_path, cached_key
+
+def primary_variant(variants: List[SubtitleConfig]) -> SubtitleConfig:
+    """The variant input checks run against: one that needs a video stream, if any does."""
+    return next((settings for settings in variants if settings.output_mode not in SUBTITLE_WRITERS), variants[0])
+
+def process_variants(
+    input_video_path: str, base_name: str, variants: List[SubtitleConfig],
+    on_progress: ProgressCallback = _ignore_progress, output_dir: str = OUTPUT_DIR, media: Optional[MediaInfo] = None
+) -> List[Tuple[str, str]]:
+    """Renders several variants of one input, sharing the work; returns (output_path, transcript_key) per variant.
+
+    The audio is extracted once, each distinct transcript (language, model size, mode,
+    device) is made once, and two or more 'burn' variants come out of a single ffmpeg
+    decode with one encoder per variant (render_parallelism does not apply there).
+    Other output modes render as in process_video.
+    """
+    start = time.perf_counter()
+    if media is None:
+        media = inspect_input(input_video_path, primary_variant(variants))
+    media_seconds = media.duration if media else None
+    input_bytes = os.path.getsize(input_video_path)
+    INPUT_BYTES.inc(input_bytes)
+    INPUT_SIZE_BYTES.observe(input_bytes)
+
+    audio = load_audio(input_video_path, base_name, on_progress, media)
+    transcripts: Dict[Tuple[str, str, str, bool], Tuple[str, List[TranscriptSegment]]] = {}
+    for settings in variants:
+        transcript_id = (settings.lang, settings.model_size, settings.transcription_mode, settings.use_gpu)
+        if transcript_id not in transcripts:
+            transcripts[transcript_id] = transcribe_audio(audio, settings, on_progress, media)
+    # Free the samples before the (long) render
+    del audio
+
+    render_start = time.perf_counter()
+    results: List[Tuple[str, str]] = []
+    burns = []
+    # Holds the shared burn's ASS files until it is done
+    with artifact_store.workspace() as work_dir:
+        # A lone burn variant takes the regular path (segmented rendering, progress events)
+        shared_burn = sum(settings.output_mode == "burn" for settings in variants) > 1
+        for i, settings in enumerate(variants):
+            key, segments = transcripts[(settings.lang, settings.model_size, settings.transcription_mode, settings.use_gpu)]
+            variant_name = f"{base_name}_{i}"
+            if settings.output_mode == "burn" and shared_burn:
+                ass_path = os.path.join(work_dir, f"{variant_name}.ass")
+                with observe_stage("create_ass"):
+                    create_ass_file(segments, ass_path, settings)
+                output_path = output_path_for(variant_name, settings, output_dir)
+                burns.append((ass_path, output_path, settings.video_encoding_preset))
+            else:
+                output_path = render_video(input_video_path, variant_name, segments, settings, on_progress, output_dir, media)
+            results.append((output_path, key))
+
+        if burns:
+            on_progress("stage", {"stage": "rendering", "output_mode": "burn", "variants": len(burns)})
+            scale_height = render_scale_height(media)
+            # The encoders run side by side in one process and share its cores
+            threads = max(1, encoder_threads(scale_height or media.height) // len(burns)) if media else 0
+            with scheduler.slot(STAGE_FFMPEG, waiting_reporter(on_progress)), observe_stage("burn"):
+                burn_subtitles_multi(input_video_path, burns, threads, scale_height)
+
+    end = time.perf_counter()
+    observe_realtime_factor("render", end - render_start, media_seconds)
+    observe_realtime_factor("total", end - start, media_seconds)
+    if media_seconds:
+        MEDIA_SECONDS.inc(media_seconds)
+    OUTPUT_BYTES.inc(sum(os.path.getsize(output_path) for output_path, _ in results))
+    return results
+
+def write_bundle(output_paths: List[str], variants: List[SubtitleConfig], bundle_path: str) -> str:
+    """Zips variant outputs together with a manifest.json of each file's settings.
+
+    Videos are stored as-is (already compressed); subtitle files are deflated.
+    """
+    manifest = []
+    with zipfile.ZipFile(bundle_path, "w") as bundle:
+        for i, (output_path, settings) in enumerate(zip(output_paths, variants)):
+            name = f"{i:02}_{settings.lang}_{settings.output_mode}{os.path.splitext(output_path)[1]}"
+            compression = zipfile.ZIP_DEFLATED if settings.output_mode in SUBTITLE_WRITERS else zipfile.ZIP_STORED
+            bundle.write(output_path, name, compress_type=compression)
+            manifest.append({"file": name, "config": settings.model_dump()})
+        bundle.writestr("manifest.json", json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    return bundle_path
@@ -0,0 +1,49 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+from app.config import INFERENCE_SLOTS, FFMPEG_SLOTS
+
+logger = logging.getLogger("uvicorn")
+
+# Stage pools: model inference (transcription) and ffmpeg work (extraction, burning, muxing)
+STAGE_INFERENCE = "inference"
+STAGE_FFMPEG = "ffmpeg"
+
+class StageScheduler:
+    """Bounded slot pools that every job's stages queue on.
+
+    A job holds the inference slot only while it transcribes and an ffmpeg slot only
+    while ffmpeg runs, so with several jobs in flight one can transcribe while another
+    burns. The pools default to per-process semaphores; start_workers swaps in
+    multiprocessing semaphores shared by the API and all of its worker processes.
+    """
+
+    def __init__(self, inference_slots: int = INFERENCE_SLOTS, ffmpeg_slots: int = FFMPEG_SLOTS):
+        self._pools: Dict[str, object] = {
+            STAGE_INFERENCE: threading.BoundedSemaphore(inference_slots),
+            STAGE_FFMPEG: threading.BoundedSemaphore(ffmpeg_slots),
+        }
+
+    def use(self, inference, ffmpeg) -> None:
+        """Replaces the pools with externally created (e.g. cross-process) semaphores."""
+        self._pools = {STAGE_INFERENCE: inference, STAGE_FFMPEG: ffmpeg}
+
+    @contextmanager
+    def slot(self, stage: str, on_wait: Optional[Callable[[str], None]] = None) -> Iterator[None]:
+        """Holds one slot of `stage` for the duration of the block, waiting if all are busy."""
+        pool = self._pools[stage]
+        # Positional argument: threading and multiprocessing name the `block` flag differently
+        if not pool.acquire(False):
+            if on_wait:
+                on_wait(stage)
+            start = time.perf_counter()
+            pool.acquire()
+            logger.info(f"Waited {time.perf_counter() - start:.2f}s for a slot in the {stage} pool")
+        try:
+            yield
+        finally:
+            pool.release()
+
+scheduler = StageScheduler()
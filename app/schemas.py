@@ -1,5 +1,11 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Literal
+from typing import Literal, Optional
+from app.config import DEFAULT_MODEL_SIZE, RENDER_PARALLELISM
+
+WhisperModelSize = Literal[
+    "tiny", "tiny.en", "base", "base.en", "small", "small.en", "medium", "medium.en",
+    "large-v1", "large-v2", "large-v3", "distil-large-v3", "turbo"
+]
 
 class SubtitleConfig(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -13,10 +19,34 @@ class SubtitleConfig(BaseModel):
     lang: str = Field(default="en", description="Audio language code (e.g., 'en', 'th')")
     position: Literal["1", "2", "3", "4"] = Field(default="1", description="1=Bottom, 2=Middle, 3=Top, 4=Offset Bottom")
     use_gpu: bool = Field(default=True, description="Enable GPU acceleration for transcription")
+    model_size: WhisperModelSize = Field(
+        default=DEFAULT_MODEL_SIZE,
+        description="Whisper model size, e.g. 'tiny' for fast drafts, 'medium' for final renders"
+    )
+    transcription_mode: Literal["single", "parallel"] = Field(
+        default="single",
+        description="'parallel' splits audio at silences (VAD) and transcribes the chunks on a CPU process pool. Best for long videos on CPU-only nodes."
+    )
     video_encoding_preset: Literal["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"] = Field(
         default="ultrafast", 
         description="FFmpeg encoding preset. 'ultrafast' is fastest but larger file size. 'medium' is default balance."
     )
+    render_parallelism: int = Field(
+        default=RENDER_PARALLELISM, ge=1, le=32,
+        description="Number of parallel ffmpeg processes for burning. Above 1, the video is split at keyframes, rendered in segments and losslessly joined."
+    )
+    output_mode: Literal["burn", "soft", "ass", "srt", "vtt", "json"] = Field(
+        default="burn",
+        description="'burn' hardcodes subtitles (full re-encode). 'soft' muxes a subtitle track with -c copy. 'ass'/'srt'/'vtt'/'json' return only the subtitle file."
+    )
+    output_container: Literal["mp4", "mkv"] = Field(
+        default="mp4",
+        description="Container for 'soft' output: mp4 (mov_text, unstyled) or mkv (styled ASS + font)"
+    )
+    fragmented: bool = Field(
+        default=False,
+        description="Write 'burn' output as fragmented MP4 so it can be streamed and played while still encoding (/generate/stream, /jobs/{id}/stream). Burns in a single ffmpeg process."
+    )
 
     @property
     def alignment(self) -> int:
@@ -26,3 +56,27 @@ class SubtitleConfig(BaseModel):
     @property
     def margin_v(self) -> int:
         return 180 if self.position == "4" else 30
+
+class PreviewConfig(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    start: Optional[float] = Field(
+        default=None, ge=0,
+        description="Start of a single preview window in seconds. Leave unset to sample short clips across the video instead."
+    )
+    duration: float = Field(default=10.0, gt=0, le=60, description="Length of the single preview window in seconds")
+    clips: int = Field(default=4, ge=1, le=12, description="Number of clips sampled across the transcript when `start` is unset")
+    clip_seconds: float = Field(default=3.0, gt=0, le=10, description="Length of each sampled clip in seconds")
+    height: int = Field(default=360, ge=144, le=1080, description="Preview height in pixels; width follows the aspect ratio")
+    fps: int = Field(default=12, ge=1, le=30, description="Preview frame rate")
+
+class JobStatus(BaseModel):
+    id: str = Field(description="Job ID returned by POST /jobs")
+    status: Literal["queued", "running", "done", "failed"] = Field(description="Current job state")
+    filename: str = Field(description="Original upload filename")
+    created_at: float = Field(description="Submission time (unix seconds)")
+    started_at: Optional[float] = Field(default=None, description="Time a worker picked the job up")
+    finished_at: Optional[float] = Field(default=None, description="Time the job finished or failed")
+    error: Optional[str] = Field(default=None, description="Failure reason when status is 'failed'")
+    transcript_key: Optional[str] = Field(default=None, description="Cached transcript hash; pass to /restyle to skip transcription")
+    result_url: Optional[str] = Field(default=None, description="Download URL once status is 'done'")
@@ -1,39 +1,269 @@
 import os
+import json
+import shutil
+import tempfile
 import subprocess
 import time
 import logging
+import threading
+import numpy as np
+from dataclasses import dataclass, asdict
 from datetime import timedelta
-from faster_whisper import WhisperModel
-from app.config import FONTS_DIR, DEFAULT_FONT_NAME
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from app.config import (
+    FONTS_DIR, TEMP_DIR, DEFAULT_FONT_NAME, DEFAULT_FONT_FILE, BATCHED_INFERENCE, RENDER_MIN_SEGMENT_SECONDS, DEFAULT_MODEL_SIZE, GPU_COMPUTE_TYPE,
+    CPU_COMPUTE_TYPE, CPU_THREADS, MODEL_MEMORY_BUDGET_BYTES, DEVICE, FFMPEG_SLOTS, SILENCE_THRESHOLD_DBFS,
+    WORD_TIMESTAMPS
+)
 from app.schemas import SubtitleConfig
-from typing import List, Iterable
+from app.metrics import MODEL_REQUESTS, observe_stage, record_ffmpeg_cpu
+from app.events import event_blocks, ass_dialogue
+from typing import TYPE_CHECKING, Callable, Dict, List, Iterable, Iterator, Optional, Tuple, Union
+
+# faster_whisper (and CTranslate2, PyAV, tokenizers behind it) is imported where a model
+# is first needed, so the API and workers start without paying for it
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+# Whisper consumes 16 kHz mono audio
+SAMPLE_RATE = 16000
+# Bytes of s16le PCM read from ffmpeg per iteration (~2 s of audio)
+PCM_CHUNK_BYTES = 1 << 16
 
 logger = logging.getLogger("uvicorn")
 
+# on_progress(event_type, data): receives "stage", "segment" and "progress" events while a video is processed
+ProgressCallback = Callable[[str, dict], None]
+
+@dataclass
+class TranscriptWord:
+    start: float
+    end: float
+    word: str
+    probability: float
+
+@dataclass
+class TranscriptSegment:
+    """Plain, serializable stand-in for faster-whisper's Segment.
+
+    Carries only what subtitle generation needs, so it can be cached on disk
+    and rebuilt without loading the model.
+    """
+    start: float
+    end: float
+    text: str
+    words: Optional[List[TranscriptWord]] = None
+
+    @classmethod
+    def from_segment(cls, segment) -> "TranscriptSegment":
+        words = getattr(segment, "words", None)
+        return cls(
+            start=segment.start,
+            end=segment.end,
+            text=segment.text,
+            words=[TranscriptWord(w.start, w.end, w.word, w.probability) for w in words] if words else None,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TranscriptSegment":
+        words = data.get("words")
+        return cls(
+            start=data["start"],
+            end=data["end"],
+            text=data["text"],
+            words=[TranscriptWord(**w) for w in words] if words else None,
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+@dataclass
+class MediaInfo:
+    """What ffprobe reports about an input, read once and reused by every stage."""
+    duration: Optional[float]
+    format_name: str
+    video_codec: Optional[str] = None
+    width: int = 0
+    height: int = 0
+    audio_codec: Optional[str] = None
+    sample_rate: int = 0
+    channels: int = 0
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_codec is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+    @property
+    def audio_is_whisper_pcm(self) -> bool:
+        """The audio is already the 16 kHz mono s16le PCM that extraction produces."""
+        return self.audio_codec == "pcm_s16le" and self.sample_rate == SAMPLE_RATE and self.channels == 1
+
+class UnsupportedMediaError(ValueError):
+    """The input can't be processed: not readable media, or missing a stream the output needs."""
+
+class InputTooLargeError(UnsupportedMediaError):
+    """The input exceeds the configured size, duration or resolution limits."""
+
+# Approximate parameter counts, used to estimate resident model memory
+MODEL_PARAMS_MILLIONS = {
+    "tiny": 39, "tiny.en": 39, "base": 74, "base.en": 74, "small": 244, "small.en": 244,
+    "medium": 769, "medium.en": 769, "large-v1": 1550, "large-v2": 1550, "large-v3": 1550,
+    "large": 1550, "distil-large-v3": 756, "turbo": 809, "large-v3-turbo": 809,
+}
+BYTES_PER_PARAM = {"int8": 1, "int8_float16": 1, "int8_bfloat16": 1, "int8_float32": 1, "float16": 2, "bfloat16": 2, "float32": 4}
+
+# (model_size, device, compute_type, cpu_threads)
+ModelKey = Tuple[str, str, str, int]
+
 class ModelManager:
-    _instance = None
-    _device = "cpu"
+    """Process-wide registry of loaded Whisper models.
+
+    Models are keyed by (size, device, compute_type, cpu_threads), so requests asking
+    for different sizes or devices each get their own instance instead of swapping a
+    single one back and forth. The registry is LRU-ordered and evicts the least
+    recently used models once the estimated total exceeds MODEL_MEMORY_BUDGET_BYTES.
+    Loading is single-flight: concurrent requests for the same key wait for one load.
+    """
+    _models: "OrderedDict[ModelKey, WhisperModel]" = OrderedDict()
+    _batchers: Dict[ModelKey, object] = {}
+    _lock = threading.Lock()
+    _key_locks: Dict[ModelKey, threading.Lock] = {}
+    # None until the first GPU request resolves DEVICE; True also after a CUDA load failure
+    _cuda_unavailable: Optional[bool] = None
+
+    @classmethod
+    def cuda_available(cls) -> bool:
+        """Whether GPU requests should use CUDA, decided once per process from DEVICE."""
+        if cls._cuda_unavailable is None:
+            if DEVICE == "cpu":
+                cls._cuda_unavailable = True
+            elif DEVICE == "auto":
+                # Asking CTranslate2 for devices is cheap; a failed CUDA model load is not
+                import ctranslate2
+                try:
+                    cls._cuda_unavailable = ctranslate2.get_cuda_device_count() == 0
+                except Exception:
+                    cls._cuda_unavailable = True
+                if cls._cuda_unavailable:
+                    logger.info("No CUDA device found, GPU requests will run on CPU")
+            else:
+                cls._cuda_unavailable = False
+        return not cls._cuda_unavailable
+
+    @classmethod
+    def compute_type_for(cls, use_gpu: bool) -> str:
+        return GPU_COMPUTE_TYPE if use_gpu and cls.cuda_available() else CPU_COMPUTE_TYPE
+
+    @classmethod
+    def model_key(cls, use_gpu: bool, model_size: str = DEFAULT_MODEL_SIZE, cpu_threads: int = CPU_THREADS) -> ModelKey:
+        if use_gpu and cls.cuda_available():
+            # cpu_threads has no effect on CUDA models, keep it out of the key
+            return (model_size, "cuda", GPU_COMPUTE_TYPE, 0)
+        return (model_size, "cpu", CPU_COMPUTE_TYPE, cpu_threads)
+
+    @staticmethod
+    def estimate_bytes(key: ModelKey) -> int:
+        model_size, _, compute_type, _ = key
+        params = MODEL_PARAMS_MILLIONS.get(model_size, MODEL_PARAMS_MILLIONS["large-v3"]) * 1_000_000
+        # ~20% on top of the weights for runtime buffers
+        return int(params * BYTES_PER_PARAM.get(compute_type, 4) * 1.2)
 
     @classmethod
-    def load_model(cls, use_gpu: bool = True):
-        device = "cuda" if use_gpu else "cpu"
-        compute_type = "float16" if use_gpu else "int8"
-        
-        if cls._instance is None or cls._device != device:
+    def load_model(cls, use_gpu: bool = True, model_size: str = DEFAULT_MODEL_SIZE, cpu_threads: int = CPU_THREADS) -> "WhisperModel":
+        key = cls.model_key(use_gpu, model_size, cpu_threads)
+        with cls._lock:
+            model = cls._models.get(key)
+            if model is not None:
+                cls._models.move_to_end(key)
+                MODEL_REQUESTS.labels("hit").inc()
+                return model
+            key_lock = cls._key_locks.setdefault(key, threading.Lock())
+
+        # Single-flight: only one thread loads a given key, the others wait for it
+        with key_lock:
+            with cls._lock:
+                model = cls._models.get(key)
+                if model is not None:
+                    cls._models.move_to_end(key)
+                    MODEL_REQUESTS.labels("hit").inc()
+                    return model
+            if key != cls.model_key(use_gpu, model_size, cpu_threads):
+                # CUDA failed for another thread while this one waited
+                return cls.load_model(use_gpu=False, model_size=model_size, cpu_threads=cpu_threads)
             try:
-                logger.info(f"Loading Whisper Model on {device}...")
-                cls._instance = WhisperModel("small", device=device, compute_type=compute_type)
-                cls._device = device
-                logger.info("Model loaded successfully.")
+                MODEL_REQUESTS.labels("load").inc()
+                with observe_stage("model_load"):
+                    model = cls._load(key)
             except Exception as e:
-                logger.error(f"Failed to load model on {device}: {e}")
-                if device == "cuda":
-                    logger.info("Falling back to CPU...")
-                    cls._instance = WhisperModel("small", device="cpu", compute_type="int8")
-                    cls._device = "cpu"
-                else:
-                    raise e
-        return cls._instance
+                if key[1] != "cuda":
+                    raise
+                logger.error(f"Failed to load model on cuda: {e}")
+                logger.info("Falling back to CPU...")
+                cls._cuda_unavailable = True
+                return cls.load_model(use_gpu=False, model_size=model_size, cpu_threads=cpu_threads)
+            with cls._lock:
+                cls._evict_for(key)
+                cls._models[key] = model
+            return model
+
+    @classmethod
+    def _load(cls, key: ModelKey) -> "WhisperModel":
+        from faster_whisper import WhisperModel
+        model_size, device, compute_type, cpu_threads = key
+        logger.info(f"Loading Whisper Model '{model_size}' on {device} ({compute_type}, cpu_threads={cpu_threads})...")
+        model = WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        logger.info("Model loaded successfully.")
+        return model
+
+    @classmethod
+    def _evict_for(cls, key: ModelKey) -> None:
+        """Drops least recently used models until `key` fits the budget. Caller holds _lock."""
+        needed = cls.estimate_bytes(key)
+        used = sum(cls.estimate_bytes(k) for k in cls._models)
+        while cls._models and used + needed > MODEL_MEMORY_BUDGET_BYTES:
+            old_key, _ = cls._models.popitem(last=False)
+            batcher = cls._batchers.pop(old_key, None)
+            if batcher is not None:
+                # Its inference thread would otherwise keep the model in memory
+                batcher.close()
+            used -= cls.estimate_bytes(old_key)
+            # Requests still holding the model keep it alive until they finish
+            logger.info(f"Evicted Whisper Model {old_key} to stay within the memory budget")
+
+    @classmethod
+    def get_batcher(cls, use_gpu: bool = True, model_size: str = DEFAULT_MODEL_SIZE):
+        """Returns the cross-request batched inference engine for the requested model."""
+        # Imported lazily: app.batching depends on this module
+        from app.batching import BatchedTranscriber
+
+        model = cls.load_model(use_gpu, model_size)
+        key = cls.model_key(use_gpu, model_size)
+        with cls._lock:
+            batcher = cls._batchers.get(key)
+            if batcher is None or batcher.model is not model:
+                if batcher is not None:
+                    batcher.close()
+                batcher = cls._batchers[key] = BatchedTranscriber(model)
+            return batcher
+
+    @classmethod
+    def preload(cls, model_size: str = DEFAULT_MODEL_SIZE, warmup: bool = False) -> None:
+        """Loads the model GPU requests will use and optionally runs one warmup inference.
+
+        The warmup transcribes a second of silence, so CTranslate2's first-use
+        allocations happen now rather than during the first real request.
+        """
+        model = cls.load_model(use_gpu=True, model_size=model_size)
+        if warmup:
+            start = time.perf_counter()
+            segments, _ = model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), language="en")
+            list(segments)
+            logger.info(f"Warmup inference took {time.perf_counter() - start:.2f}s")
 
 def format_time(seconds: float) -> str:
     td = timedelta(seconds=seconds)
@@ -44,102 +274,565 @@ def format_time(seconds: float) -> str:
     centis = int((seconds - total_seconds) * 100)
     return f"{hours}:{minutes:02}:{secs:02}.{centis:02}"
 
-def extract_audio(video_path: str, audio_path: str) -> None:
+def wait_process(process: subprocess.Popen, stage: str) -> int:
+    """Waits for an ffmpeg process and records its CPU time under `stage`; returns the exit code."""
+    if not hasattr(os, "wait4"):
+        # Windows: no per-process rusage
+        return process.wait()
+    _, status, usage = os.wait4(process.pid, 0)
+    # Tell Popen the child is reaped so it doesn't wait on it again
+    process.returncode = os.waitstatus_to_exitcode(status)
+    record_ffmpeg_cpu(stage, usage.ru_utime, usage.ru_stime)
+    return process.returncode
+
+def run_ffmpeg(cmd: List[str], stage: str) -> None:
+    """subprocess.run(cmd, check=True) for ffmpeg, also recording the process's CPU time.
+
+    Raises CalledProcessError with the captured stderr on failure.
+    """
+    # stderr goes to a file: nothing reads it while ffmpeg runs, so a pipe could fill up
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr)
+        returncode = wait_process(process, stage)
+        if returncode:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr.read())
+
+def pcm_codec_args(copy_audio: bool) -> List[str]:
+    """Output codec options for 16 kHz mono s16le; `copy_audio` skips decoding when the input already is."""
+    if copy_audio:
+        return ["-c:a", "copy"]
+    return ["-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-ac", "1"]
+
+def extract_audio(video_path: str, audio_path: str, copy_audio: bool = False) -> None:
     logger.info(f"Extracting audio from {video_path} to {audio_path}")
-    command = [
-        "ffmpeg", "-y", "-i", video_path,
-        "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
-        audio_path
-    ]
+    command = ["ffmpeg", "-y", "-i", video_path, "-vn", *pcm_codec_args(copy_audio), audio_path]
     # Capture stderr to debug ffmpeg issues
     try:
-        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        run_ffmpeg(command, "extract_audio")
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr.decode()
         logger.error(f"FFmpeg failed: {error_msg}")
         raise RuntimeError(f"FFmpeg failed with error: {error_msg}")
 
+def probe_duration(video_path: str) -> Optional[float]:
+    """Returns the container duration in seconds, or None if ffprobe can't tell."""
+    command = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", video_path
+    ]
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        return float(result.stdout.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+def probe_media(video_path: str) -> Optional[MediaInfo]:
+    """Reads the container and first audio/video stream info in a single ffprobe call.
 
-def generate_subtitles(audio_path: str, lang: str, use_gpu: bool) -> List:
+    Returns None when ffprobe isn't installed, so callers skip the fast paths. Raises
+    UnsupportedMediaError when ffprobe can't read the file at all.
+    """
+    command = [
+        "ffprobe", "-v", "error", "-show_entries",
+        "format=duration,format_name:stream=codec_type,codec_name,width,height,sample_rate,channels"
+        ":stream_disposition=attached_pic",
+        "-of", "json", video_path
+    ]
     try:
-        model = ModelManager.load_model(use_gpu)
-        segments, _ = model.transcribe(audio_path, language=lang)
-        # Convert generator to list to ensure processing finishes
-        return list(segments)
-    except Exception as e:
-        logger.error(f"Transcription failed: {str(e)}")
-        raise
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+    except OSError:
+        return None
+    except subprocess.CalledProcessError as e:
+        raise UnsupportedMediaError(f"Not a readable media file: {e.stderr.strip() or 'ffprobe failed'}")
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        raise UnsupportedMediaError("Not a readable media file")
+
+    container = data.get("format", {})
+    try:
+        duration = float(container["duration"])
+    except (KeyError, ValueError):
+        duration = None
+    info = MediaInfo(duration=duration, format_name=container.get("format_name", ""))
+    for stream in data.get("streams", []):
+        codec_type = stream.get("codec_type")
+        # Cover art is stored as a one-frame video stream
+        if codec_type == "video" and not info.has_video and not stream.get("disposition", {}).get("attached_pic"):
+            info.video_codec = stream.get("codec_name", "")
+            info.width, info.height = int(stream.get("width", 0)), int(stream.get("height", 0))
+        elif codec_type == "audio" and not info.has_audio:
+            info.audio_codec = stream.get("codec_name", "")
+            info.sample_rate, info.channels = int(stream.get("sample_rate", 0)), int(stream.get("channels", 0))
+    return info
+
+def is_silent(audio: np.ndarray, threshold_dbfs: float = SILENCE_THRESHOLD_DBFS) -> bool:
+    """True when no sample reaches `threshold_dbfs` (always for empty audio)."""
+    if not len(audio):
+        return True
+    # max/min instead of abs(): no full-length temporary copy
+    peak = max(float(audio.max()), -float(audio.min()))
+    return peak < 10 ** (threshold_dbfs / 20)
+
+def extract_audio_array(video_path: str, duration: Optional[float] = None, copy_audio: bool = False) -> np.ndarray:
+    """Decodes the audio track straight into memory as 16 kHz mono float32 samples.
+
+    ffmpeg writes raw s16le PCM to stdout; nothing touches the disk. The output buffer
+    is preallocated from the probed duration and only grown if the probe was short.
+    With `copy_audio` (input audio already 16 kHz mono s16le) ffmpeg only demuxes.
+    """
+    if duration is None:
+        duration = probe_duration(video_path)
+    logger.info(f"Extracting audio from {video_path} into memory{' (stream copy)' if copy_audio else ''}")
+    command = [
+        "ffmpeg", "-nostdin", "-v", "error", "-i", video_path,
+        "-vn", "-f", "s16le", *pcm_codec_args(copy_audio),
+        "pipe:1"
+    ]
+    # One second of slack absorbs container/stream duration rounding
+    capacity = int(((duration or 0) + 1) * SAMPLE_RATE)
+    audio = np.empty(capacity, dtype=np.float32)
+    filled = 0
+    carry = b""
+
+    # stderr goes to a file: only stdout is read while ffmpeg runs, and a corrupt input can
+    # log enough errors to fill a stderr pipe and deadlock both sides
+    stderr = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+    try:
+        while True:
+            data = process.stdout.read(PCM_CHUNK_BYTES)
+            if not data:
+                break
+            data = carry + data
+            usable = len(data) - (len(data) % 2)
+            carry = data[usable:]
+            samples = np.frombuffer(data, dtype=np.int16, count=usable // 2)
+            if filled + len(samples) > len(audio):
+                audio = np.resize(audio, max(len(audio) * 2, filled + len(samples)))
+            # int16 -> [-1.0, 1.0) float32 in place, no intermediate full-length copy
+            np.multiply(samples, 1.0 / 32768.0, out=audio[filled:filled + len(samples)], casting="unsafe")
+            filled += len(samples)
+        wait_process(process, "extract_audio")
+        stderr.seek(0)
+        error_msg = stderr.read().decode(errors="replace")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        stderr.close()
+
+    if process.returncode != 0:
+        logger.error(f"FFmpeg failed: {error_msg}")
+        raise RuntimeError(f"FFmpeg failed with error: {error_msg}")
+    return audio[:filled]
+
+
+def stream_subtitles(audio: Union[str, np.ndarray], lang: str, use_gpu: bool, model_size: str = DEFAULT_MODEL_SIZE) -> Iterator:
+    """Yields segments as the model decodes them, from a WAV path or a 16 kHz float32 sample array.
+
+    The batched engine only returns once every window of the request is decoded, so
+    in that mode all segments arrive together.
+    """
+    try:
+        if BATCHED_INFERENCE:
+            if isinstance(audio, str):
+                from faster_whisper import decode_audio
+                audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+            from app.batching import BatcherClosedError
+            try:
+                segments = ModelManager.get_batcher(use_gpu, model_size).transcribe(audio, lang)
+            except BatcherClosedError:
+                # Its model was evicted between the lookup and the call; the registry loads a new one
+                segments = ModelManager.get_batcher(use_gpu, model_size).transcribe(audio, lang)
+            yield from segments
+            return
+        model = ModelManager.load_model(use_gpu, model_size)
+        # faster-whisper decodes lazily: each window is transcribed as the generator is consumed
+        segments, _ = model.transcribe(audio, language=lang, word_timestamps=WORD_TIMESTAMPS)
+        yield from segments
     except Exception as e:
         logger.error(f"Transcription failed: {str(e)}")
         raise
 
+def generate_subtitles(audio: Union[str, np.ndarray], lang: str, use_gpu: bool, model_size: str = DEFAULT_MODEL_SIZE) -> List:
+    """Transcribes a WAV path or a 16 kHz float32 sample array."""
+    return list(stream_subtitles(audio, lang, use_gpu, model_size))
+
+def iter_subtitle_events(segments: Iterable, settings: SubtitleConfig) -> Iterator[Tuple[float, float, str]]:
+    """Yields (start, end, text) subtitle lines of at most `max_words_per_line` words.
+
+    Lines follow word timestamps where the transcript has them; otherwise each segment's
+    duration is spread evenly across its words. Every output format (ASS, SRT, VTT,
+    JSON) is built from these same events.
+    """
+    for starts, ends, texts in event_blocks(segments, settings.max_words_per_line):
+        yield from zip(starts.tolist(), ends.tolist(), texts)
+
+# Bounce entry effect, prepended to every line when enable_bounce is set
+BOUNCE_EFFECT = r"{\fscx30\fscy30\t(0,75,\fscx115\fscy115)\t(75,150,\fscx100\fscy100)}"
+
 def create_ass_file(segments, ass_path: str, settings: SubtitleConfig) -> None:
+    """Writes the ASS script; events are formatted a block at a time and written in one call per block."""
     hex_color = settings.subtitle_color.lstrip("#")
     # ASS format expects BGR, not RGB
     bgr_hex = f"&H00{hex_color[4:6]}{hex_color[2:4]}{hex_color[0:2]}"
-    
+    header = (
+        "[Script Info]\nScriptType: v4.00+\nPlayResX:1280\nPlayResY:720\nWrapStyle:0\nScaledBorderAndShadow:yes\n\n"
+        "[V4+ Styles]\nFormat: Name,Fontname,Fontsize,PrimaryColour,Bold,Italic,Underline,StrikeOut,ScaleX,ScaleY,Spacing,Angle,BorderStyle,Outline,Shadow,Alignment,MarginL,MarginR,MarginV,Encoding\n"
+        f"Style: Default,{DEFAULT_FONT_NAME},{settings.font_size},{bgr_hex},{settings.font_weight},0,0,0,100,100,0,0,1,2,{settings.shadow_strength},{settings.alignment},10,10,{settings.margin_v},1\n\n"
+        "[Events]\nFormat: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text\n"
+    )
+    prefix = BOUNCE_EFFECT if settings.enable_bounce else ""
+
     with open(ass_path, "w", encoding="utf-8") as f:
-        # Header
-        f.write("[Script Info]\nScriptType: v4.00+\nPlayResX:1280\nPlayResY:720\nWrapStyle:0\nScaledBorderAndShadow:yes\n\n")
-        # Styles
-        f.write("[V4+ Styles]\nFormat: Name,Fontname,Fontsize,PrimaryColour,Bold,Italic,Underline,StrikeOut,ScaleX,ScaleY,Spacing,Angle,BorderStyle,Outline,Shadow,Alignment,MarginL,MarginR,MarginV,Encoding\n")
-        f.write(f"Style: Default,{DEFAULT_FONT_NAME},{settings.font_size},{bgr_hex},{settings.font_weight},0,0,0,100,100,0,0,1,2,{settings.shadow_strength},{settings.alignment},10,10,{settings.margin_v},1\n\n")
-        # Events
-        f.write("[Events]\nFormat: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text\n")
-        
-        for segment in segments:
-            words = segment.text.strip().split()
-            if not words:
-                continue
-            
-            duration = segment.end - segment.start
-            if duration <= 0:
+        f.write(header)
+        for starts, ends, texts in event_blocks(segments, settings.max_words_per_line):
+            f.write(ass_dialogue(starts, ends, texts, prefix))
+
+def escape_filter_path(path: str) -> str:
+    # Forward slashes + escaped colons keep Windows drive letters (C:) valid inside filter arguments
+    return path.replace("\\", "/").replace(":", "\\:")
+
+def ass_filter(ass_path: str) -> str:
+    return f"ass='{escape_filter_path(ass_path)}':fontsdir='{escape_filter_path(FONTS_DIR)}'"
+
+def run_ffmpeg_with_progress(
+    cmd: List[str], duration: Optional[float], on_progress: Callable[[dict], None], stage: str = "burn"
+) -> None:
+    """Runs an ffmpeg command, reporting {"frame", "seconds", "percent"} from its `-progress` output.
+
+    Raises CalledProcessError (with stderr) on failure, like subprocess.run(check=True).
+    """
+    cmd = cmd[:1] + ["-progress", "pipe:1", "-nostats"] + cmd[1:]
+    # stderr goes to a file so a chatty ffmpeg can't block on a full pipe while we read stdout
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        report = {}
+        for line in process.stdout:
+            key, _, value = line.strip().partition("=")
+            report[key] = value
+            # Every report block ends with progress=continue|end
+            if key != "progress":
                 continue
+            try:
+                seconds = int(report.get("out_time_us", "0")) / 1_000_000
+            except ValueError:
+                seconds = 0.0
+            percent = round(min(100.0, 100 * seconds / duration), 1) if duration else None
+            if value == "end":
+                percent = 100.0
+            on_progress({"frame": int(report.get("frame", "0") or 0), "seconds": round(seconds, 2), "percent": percent})
+            report = {}
+        returncode = wait_process(process, stage)
+        if returncode:
+            stderr.seek(0)
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr.read())
 
-            avg_word_duration = duration / len(words)
-            
-            for i in range(0, len(words), settings.max_words_per_line):
-                chunk = words[i:i + settings.max_words_per_line]
-                chunk_start = segment.start + i * avg_word_duration
-                chunk_end = chunk_start + len(chunk) * avg_word_duration
-                text = " ".join(chunk)
-                
-                if settings.enable_bounce:
-                    effect = r"{\fscx30\fscy30\t(0,75,\fscx115\fscy115)\t(75,150,\fscx100\fscy100)}"
-                    text = f"{effect}{text}"
-                
-                f.write(f"Dialogue: 0,{format_time(chunk_start)},{format_time(chunk_end)},Default,,0,0,0,,{text}\n")
-
-def burn_subtitles(video_path: str, ass_path: str, output_path: str, preset: str = "ultrafast") -> None:
-    # Convert paths to forward slashes for ffmpeg compatibility (Windows issue)
-    ass_path_ffmpeg = ass_path.replace("\\", "/").replace(":", "\\:")
-    fonts_dir_ffmpeg = FONTS_DIR.replace("\\", "/").replace(":", "\\:")
-    
+def encoder_threads(height: int) -> int:
+    """libx264 threads for a burn at this frame height.
+
+    Each burn gets its share of the cores under FFMPEG_SLOTS, so concurrent burns don't
+    oversubscribe the machine. Frame threads need rows to work ahead on, so small frames
+    get fewer threads (about one per 120 rows).
+    """
+    share = max(1, (os.cpu_count() or 1) // max(1, FFMPEG_SLOTS))
+    if not height:
+        return share
+    return max(1, min(share, height // 120))
+
+def render_filter(ass_path: str, scale_height: int = 0) -> str:
+    """Video filter for burning: optional downscale first, so subtitles render at the output size."""
+    if scale_height:
+        return f"scale=-2:{scale_height},{ass_filter(ass_path)}"
+    return ass_filter(ass_path)
+
+# Fragmented MP4: an empty moov up front, then a fragment at every keyframe or second
+FRAGMENTED_MP4_ARGS = ["-movflags", "+frag_keyframe+empty_moov+default_base_moof", "-frag_duration", "1000000"]
+
+def burn_subtitles(
+    video_path: str, ass_path: str, output_path: str, preset: str = "ultrafast",
+    on_progress: Optional[Callable[[dict], None]] = None, duration: Optional[float] = None,
+    threads: int = 0, scale_height: int = 0, fragmented: bool = False
+) -> None:
+    """Re-encodes the video with the subtitles drawn in.
+
+    `threads` caps the encoder's threads (0 = ffmpeg's default) and `scale_height`
+    downscales the video first (0 = keep the input size). `fragmented` writes
+    fragmented MP4: an empty moov up front, then a fragment at every keyframe or
+    second, so the file is readable while it grows.
+    """
     logger.info(f"Burning subtitles: {ass_path} -> {output_path} (Preset: {preset})")
-    
-    # Note: escaping the colon for Windows absolute paths in filter arguments
-    # Simplest safe way is usually relative paths or complex escaping. 
-    # Let's try basic forward slash replacement which works in many cases, 
-    # but the Drive letter colon (C:) is tricky in filters.
-    
-    # robust path handling for windows ffmpeg filters
-    def escape_path(path):
-        # Escape colons and backslashes
-        return path.replace("\\", "/").replace(":", "\\:")
 
     cmd = [
         "ffmpeg", "-y", "-i", video_path,
-        "-vf", f"ass='{escape_path(ass_path)}':fontsdir='{escape_path(fonts_dir_ffmpeg)}'",
+        "-vf", render_filter(ass_path, scale_height),
         "-c:v", "libx264", "-preset", preset,
-        "-c:a", "copy",
-        output_path
     ]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    if fragmented:
+        cmd += FRAGMENTED_MP4_ARGS
+    cmd += ["-c:a", "copy", output_path]
     
     # Debug print
     logger.debug(f"FFmpeg command: {' '.join(cmd)}")
     
     try:
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if on_progress:
+            run_ffmpeg_with_progress(cmd, duration or probe_duration(video_path), on_progress)
+        else:
+            run_ffmpeg(cmd, "burn")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"FFmpeg Error: {e.stderr.decode()}")
+        raise RuntimeError("FFmpeg failed to burn subtitles")
+
+def burn_subtitles_multi(
+    video_path: str, outputs: List[Tuple[str, str, str]], threads: int = 0, scale_height: int = 0
+) -> None:
+    """Burns several subtitle variants from one decode of the input.
+
+    `outputs` holds one (ass_path, output_path, preset) per variant. The decoded video
+    is split once per variant, each branch gets its own `ass` overlay and libx264
+    encoder, and audio is copied into every output. `threads` is per encoder.
+    """
+    logger.info(f"Burning {len(outputs)} subtitle variants from a single decode of {video_path}")
+    source = f"[0:v]scale=-2:{scale_height}" if scale_height else "[0:v]null"
+    chains = [f"{source},split={len(outputs)}" + "".join(f"[s{i}]" for i in range(len(outputs)))]
+    for i, (ass_path, _, _) in enumerate(outputs):
+        chains.append(f"[s{i}]{ass_filter(ass_path)}[v{i}]")
+    cmd = ["ffmpeg", "-y", "-i", video_path, "-filter_complex", ";".join(chains)]
+    for i, (_, output_path, preset) in enumerate(outputs):
+        cmd += ["-map", f"[v{i}]", "-map", "0:a?", "-c:v", "libx264", "-preset", preset]
+        if threads:
+            cmd += ["-threads", str(threads)]
+        cmd += ["-c:a", "copy", output_path]
+    try:
+        run_ffmpeg(cmd, "burn")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"FFmpeg Error: {e.stderr.decode()}")
+        raise RuntimeError("FFmpeg failed to burn subtitles")
+
+def probe_keyframes(video_path: str) -> List[float]:
+    """Returns keyframe timestamps of the first video stream.
+
+    Reads packet flags only (no decoding), so it is fast even on long inputs.
+    """
+    command = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path
+    ]
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"Keyframe probe failed: {e}")
+        return []
+    keyframes = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.append(float(pts_time))
+    return sorted(keyframes)
+
+def plan_segments(keyframes: List[float], duration: float, count: int, min_seconds: float = RENDER_MIN_SEGMENT_SECONDS) -> List[Tuple[float, float]]:
+    """Splits [0, duration) into up to `count` (start, end) ranges that start on keyframes."""
+    count = max(1, min(count, int(duration // min_seconds)))
+    boundaries = [0.0]
+    for i in range(1, count):
+        target = duration * i / count
+        # First keyframe at/after the ideal cut that keeps segments at least min_seconds long
+        candidates = [k for k in keyframes if k >= target and k - boundaries[-1] >= min_seconds and duration - k >= min_seconds]
+        if candidates and candidates[0] > boundaries[-1]:
+            boundaries.append(candidates[0])
+    boundaries.append(duration)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def parse_ass_time(value: str) -> float:
+    hours, minutes, seconds = value.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def shift_ass_file(ass_path: str, output_path: str, start: float, end: float) -> None:
+    """Writes a copy of the ASS script holding only events visible in [start, end), moved to start at 0."""
+    with open(ass_path, "r", encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as dst:
+        for line in src:
+            if not line.startswith("Dialogue:"):
+                dst.write(line)
+                continue
+            # Dialogue: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text
+            fields = line.split(",", 9)
+            event_start, event_end = parse_ass_time(fields[1]), parse_ass_time(fields[2])
+            if event_end <= start or event_start >= end:
+                continue
+            if event_start < start:
+                # Already on screen when the segment begins: the pop-in was played in the previous one
+                fields[1] = format_time(0.0)
+                if fields[9].startswith(BOUNCE_EFFECT):
+                    fields[9] = fields[9][len(BOUNCE_EFFECT):]
+            else:
+                fields[1] = format_time(event_start - start)
+            fields[2] = format_time(event_end - start)
+            dst.write(",".join(fields))
+
+def burn_subtitles_segmented(
+    video_path: str, ass_path: str, output_path: str, preset: str = "ultrafast", parallelism: int = 2,
+    on_progress: Optional[Callable[[dict], None]] = None, duration: Optional[float] = None, scale_height: int = 0,
+    threads: int = 0
+) -> None:
+    """Burns subtitles with several ffmpeg processes, one per keyframe-aligned time range.
+
+    Each segment is rendered video-only against an ASS copy shifted to the segment's
+    start, then the segments are joined with the concat demuxer (no re-encode) and the
+    original audio is copied through. Falls back to burn_subtitles when the input is
+    too short to split or can't be probed. Progress is reported per finished segment.
+    `threads` is the whole burn's encoder threads, split between the segment processes
+    (0 = the FFMPEG_SLOTS share of the cores, as encoder_threads gives).
+    """
+    if duration is None:
+        duration = probe_duration(video_path)
+    keyframes = probe_keyframes(video_path) if duration else []
+    segments = plan_segments(keyframes, duration, parallelism) if keyframes else []
+    if len(segments) < 2:
+        logger.info("Segmented burn not applicable, using a single ffmpeg process")
+        burn_subtitles(video_path, ass_path, output_path, preset, on_progress, duration, threads, scale_height)
+        return
+
+    logger.info(f"Burning subtitles in {len(segments)} parallel segments: {ass_path} -> {output_path} (Preset: {preset})")
+    threads = max(1, (threads or encoder_threads(scale_height)) // len(segments))
+    work_dir = tempfile.mkdtemp(prefix="segments_", dir=TEMP_DIR)
+    finished = []
+    finished_lock = threading.Lock()
+    try:
+        def render(index: int, start: float, end: float) -> str:
+            segment_ass = os.path.join(work_dir, f"seg_{index:03}.ass")
+            segment_path = os.path.join(work_dir, f"seg_{index:03}.mp4")
+            shift_ass_file(ass_path, segment_ass, start, end)
+            cmd = [
+                "ffmpeg", "-y", "-ss", f"{start:.6f}", "-i", video_path, "-t", f"{end - start:.6f}",
+                "-an", "-vf", render_filter(segment_ass, scale_height),
+                "-c:v", "libx264", "-preset", preset, "-threads", str(threads),
+                segment_path
+            ]
+            try:
+                run_ffmpeg(cmd, "burn")
+            except subprocess.CalledProcessError as e:
+                logger.error(f"FFmpeg Error (segment {index}): {e.stderr.decode()}")
+                raise RuntimeError("FFmpeg failed to burn subtitles")
+            if on_progress:
+                with finished_lock:
+                    finished.append(end - start)
+                    seconds = sum(finished)
+                    on_progress({
+                        "segments_done": len(finished), "segments": len(segments),
+                        "seconds": round(seconds, 2), "percent": round(min(100.0, 100 * seconds / duration), 1),
+                    })
+            return segment_path
+
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            futures = [executor.submit(render, i, start, end) for i, (start, end) in enumerate(segments)]
+            segment_paths = [future.result() for future in futures]
+
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as f:
+            for path in segment_paths:
+                f.write(f"file '{path.replace(os.sep, '/')}'\n")
+        cmd = [
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path, "-i", video_path,
+            "-map", "0:v", "-map", "1:a?", "-c", "copy",
+            output_path
+        ]
+        try:
+            run_ffmpeg(cmd, "concat")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg Error (concat): {e.stderr.decode()}")
+            raise RuntimeError("FFmpeg failed to join rendered segments")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def render_preview(
+    video_path: str, ass_path: str, output_path: str, windows: List[Tuple[float, float]],
+    height: int = 360, fps: int = 12, has_audio: bool = True
+) -> None:
+    """Renders the (start, end) windows of the video, joined, at reduced size and frame rate.
+
+    One ffmpeg process: each window is a separately seeked input with its own shifted
+    copy of the ASS script, and the burned clips are concatenated before a single
+    encode. Scaling happens before the subtitles are drawn; the script's PlayRes
+    coordinates scale with the frame, so the layout matches the full-size render.
+    """
+    logger.info(f"Rendering preview: {len(windows)} window(s) at {height}p/{fps}fps -> {output_path}")
+    work_dir = tempfile.mkdtemp(prefix="preview_", dir=TEMP_DIR)
+    try:
+        cmd = ["ffmpeg", "-y"]
+        chains = []
+        concat_inputs = ""
+        for i, (start, end) in enumerate(windows):
+            clip_ass = os.path.join(work_dir, f"clip_{i:02}.ass")
+            shift_ass_file(ass_path, clip_ass, start, end)
+            cmd += ["-ss", f"{start:.3f}", "-t", f"{end - start:.3f}", "-i", video_path]
+            # Never upscale sources that are already smaller than the preview
+            chains.append(f"[{i}:v]fps={fps},scale=-2:'min(ih,{height})',{ass_filter(clip_ass)},setsar=1[v{i}]")
+            concat_inputs += f"[v{i}]"
+            if has_audio:
+                chains.append(f"[{i}:a]aformat=sample_rates=44100:channel_layouts=stereo[a{i}]")
+                concat_inputs += f"[a{i}]"
+        outputs = "[v][a]" if has_audio else "[v]"
+        chains.append(f"{concat_inputs}concat=n={len(windows)}:v=1:a={int(has_audio)}{outputs}")
+        cmd += ["-filter_complex", ";".join(chains), "-map", "[v]"]
+        if has_audio:
+            cmd += ["-map", "[a]", "-c:a", "aac", "-b:a", "64k"]
+        cmd += [
+            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "30", "-pix_fmt", "yuv420p",
+            "-movflags", "+faststart", output_path
+        ]
+        try:
+            run_ffmpeg(cmd, "preview")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"FFmpeg Error (preview): {e.stderr.decode()}")
+            raise RuntimeError("FFmpeg failed to render the preview")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def copy_streams(video_path: str, output_path: str, fragmented: bool = False) -> None:
+    """Remuxes video and audio into `output_path` without re-encoding (nothing to burn).
+
+    `fragmented` writes fragmented MP4, as burn_subtitles does.
+    """
+    logger.info(f"Copying streams: {video_path} -> {output_path}")
+    cmd = ["ffmpeg", "-y", "-i", video_path, "-map", "0:v:0", "-map", "0:a?", "-c", "copy"]
+    if fragmented:
+        cmd += FRAGMENTED_MP4_ARGS
+    cmd += [output_path]
+    try:
+        run_ffmpeg(cmd, "copy")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"FFmpeg Error: {e.stderr.decode()}")
+        raise RuntimeError("FFmpeg failed to copy streams")
+
+def mux_soft_subtitles(video_path: str, ass_path: str, output_path: str, container: str = "mp4", lang: Optional[str] = None) -> None:
+    """Adds the subtitles as a selectable track without re-encoding audio or video.
+
+    MP4 gets a mov_text track (plain text; styling is dropped). MKV keeps the ASS
+    script as-is and attaches the subtitle font so players render the chosen style.
+    The MP4 muxer only keeps ISO 639-2 language tags, so a two-letter `lang` is
+    recorded on MKV output only.
+    """
+    logger.info(f"Muxing soft subtitles: {ass_path} -> {output_path} ({container})")
+    cmd = ["ffmpeg", "-y", "-i", video_path, "-i", ass_path]
+    if container == "mkv":
+        cmd += ["-attach", DEFAULT_FONT_FILE, "-metadata:s:t", "mimetype=application/x-truetype-font"]
+        subtitle_codec = "ass"
+    else:
+        subtitle_codec = "mov_text"
+    cmd += [
+        "-map", "0:v", "-map", "0:a?", "-map", "1:0",
+        "-c:v", "copy", "-c:a", "copy", "-c:s", subtitle_codec,
+    ]
+    if lang and container == "mkv":
+        cmd += ["-metadata:s:s:0", f"language={lang}"]
+    cmd.append(output_path)
+    try:
+        run_ffmpeg(cmd, "mux")
     except subprocess.CalledProcessError as e:
         logger.error(f"FFmpeg Error: {e.stderr.decode()}")
-        raise RuntimeError(f"FFmpeg failed to burn subtitles")
+        raise RuntimeError("FFmpeg failed to mux subtitles")
@@ -0,0 +1,173 @@
+import os
+import socket
+import logging
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from app.jobs import JobStore, EVENT_DONE, EVENT_FAILED
+from app.pipeline import process_video, throttled_progress
+from app.services import ModelManager
+from app.schemas import SubtitleConfig
+from app.scheduler import scheduler
+from app.config import (
+    JOBS_DB_PATH, WORKER_COUNT, WORKER_POLL_INTERVAL, WORKER_WATCH_INTERVAL, JOB_CONCURRENCY, INFERENCE_SLOTS,
+    FFMPEG_SLOTS, PRELOAD_MODEL, WARMUP
+)
+
+logger = logging.getLogger("uvicorn")
+
+# spawn gives every worker a clean interpreter (no inherited CUDA/CTranslate2 state)
+_mp = multiprocessing.get_context("spawn")
+
+def _worker_prefix() -> str:
+    return f"{socket.gethostname()}:"
+
+def _worker_id() -> str:
+    return f"{_worker_prefix()}{os.getpid()}"
+
+def _is_alive(worker_id: str) -> bool:
+    try:
+        pid = int(worker_id.rsplit(":", 1)[1])
+        os.kill(pid, 0)
+    except (ValueError, IndexError, ProcessLookupError):
+        return False
+    except PermissionError:
+        # Process exists but belongs to another user
+        return True
+    return True
+
+def run_job(store: JobStore, job: dict) -> None:
+    job_id = job["id"]
+    logger.info(f"Worker {os.getpid()} processing job {job_id}")
+
+    def record_event(event_type: str, data: dict) -> None:
+        store.add_event(job_id, event_type, data)
+
+    # Every event is a database row: burn progress is kept to whole-percent steps
+    on_progress = throttled_progress(record_event)
+
+    try:
+        settings = SubtitleConfig.model_validate_json(job["config"])
+        output_path, transcript_key = process_video(
+            job["input_path"], job_id, settings, cached_key=job["transcript_key"], on_progress=on_progress
+        )
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed")
+        store.fail_job(job_id, str(e))
+        store.add_event(job_id, EVENT_FAILED, {"error": str(e)})
+        return
+    # The upload is kept so the job can be restyled later without another upload
+    store.complete_job(job_id, output_path, transcript_key)
+    store.add_event(job_id, EVENT_DONE, {"transcript_key": transcript_key})
+    logger.info(f"Job {job_id} finished: {output_path}")
+
+def worker_loop(
+    db_path: str, stop_event, poll_interval: float = WORKER_POLL_INTERVAL,
+    job_concurrency: int = JOB_CONCURRENCY, stage_slots: Optional[Tuple[object, object]] = None
+) -> None:
+    """Claims and runs up to `job_concurrency` jobs at a time until `stop_event` is set.
+
+    Jobs only overlap where the stage scheduler has free slots, so one job can
+    transcribe while another burns. `stage_slots` are the (inference, ffmpeg)
+    semaphores shared with the other workers.
+    """
+    logging.basicConfig(level=logging.INFO)
+    if stage_slots is not None:
+        scheduler.use(*stage_slots)
+    store = JobStore(db_path)
+    worker_id = _worker_id()
+    if PRELOAD_MODEL:
+        # Warm before claiming, so the first job doesn't wait on the model load
+        try:
+            ModelManager.preload(warmup=WARMUP)
+        except Exception as e:
+            logger.warning(f"Worker {worker_id} model preload failed: {e}")
+    logger.info(f"Worker {worker_id} started ({job_concurrency} concurrent job(s))")
+    free = threading.BoundedSemaphore(job_concurrency)
+    # Exiting the executor waits for jobs already running
+    with ThreadPoolExecutor(max_workers=job_concurrency, thread_name_prefix="job") as executor:
+        while not stop_event.is_set():
+            # Only claim what can start now; the rest stays queued for other workers
+            if not free.acquire(timeout=poll_interval):
+                continue
+            job = store.claim_next(worker_id)
+            if job is None:
+                free.release()
+                stop_event.wait(poll_interval)
+                continue
+            executor.submit(run_job, store, job).add_done_callback(lambda _: free.release())
+    logger.info(f"Worker {worker_id} stopped")
+
+def _start_worker(index: int, db_path: str, stop_event, stage_slots: Tuple[object, object]) -> multiprocessing.Process:
+    # Not daemonic: workers may start their own process pools (parallel transcription)
+    process = _mp.Process(
+        target=worker_loop, args=(db_path, stop_event), kwargs={"stage_slots": stage_slots}, name=f"subit-worker-{index}"
+    )
+    process.start()
+    return process
+
+def _watch_workers(
+    processes: List[multiprocessing.Process], store: JobStore, db_path: str, stop_event,
+    stage_slots: Tuple[object, object], interval: float
+) -> None:
+    """Until `stop_event` is set, requeues the jobs of workers that died and starts replacements."""
+    while not stop_event.wait(interval):
+        for i, process in enumerate(processes):
+            # is_alive() also reaps an exited worker, so its PID no longer looks alive to requeue_orphans
+            if process.is_alive() or stop_event.is_set():
+                continue
+            logger.warning(f"Worker {process.pid} exited unexpectedly (code {process.exitcode}), restarting it")
+            store.requeue_orphans(_worker_prefix(), _is_alive)
+            processes[i] = _start_worker(i, db_path, stop_event, stage_slots)
+
+def start_workers(
+    count: int = WORKER_COUNT, db_path: str = JOBS_DB_PATH, watch_interval: float = WORKER_WATCH_INTERVAL
+) -> Tuple[List[multiprocessing.Process], object]:
+    """Starts `count` worker processes, replaced whenever one dies, until stop_workers is called.
+
+    Jobs left running by workers that are gone (an earlier run, or a worker that died
+    since) go back to the queue.
+    """
+    store = JobStore(db_path)
+    store.init_db()
+    store.requeue_orphans(_worker_prefix(), _is_alive)
+
+    stop_event = _mp.Event()
+    # One set of stage slots for this process and all of its workers. A worker killed
+    # mid-stage keeps its slot until these are recreated on the next start.
+    stage_slots = (_mp.BoundedSemaphore(INFERENCE_SLOTS), _mp.BoundedSemaphore(FFMPEG_SLOTS))
+    scheduler.use(*stage_slots)
+    processes = [_start_worker(i, db_path, stop_event, stage_slots) for i in range(count)]
+    # The list is updated in place, so stop_workers stops the replacements too
+    threading.Thread(
+        target=_watch_workers, args=(processes, store, db_path, stop_event, stage_slots, watch_interval),
+        name="worker-watch", daemon=True
+    ).start()
+    logger.info(f"Started {count} worker process(es)")
+    return processes, stop_event
+
+def stop_workers(processes: List[multiprocessing.Process], stop_event, timeout: float = 10.0) -> None:
+    stop_event.set()
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            logger.warning(f"Worker {process.pid} did not stop in time, terminating")
+            process.terminate()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run ScribeFlow job workers")
+    parser.add_argument("--workers", type=int, default=max(WORKER_COUNT, 1), help="Number of worker processes")
+    parser.add_argument("--db", default=JOBS_DB_PATH, help="Path to the SQLite job database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        logger.warning("PROMETHEUS_MULTIPROC_DIR is not set: the API's /metrics won't include these workers")
+    processes, stop_event = start_workers(args.workers, args.db)
+    try:
+        # Workers that die are replaced, so this runs until interrupted
+        stop_event.wait()
+    except KeyboardInterrupt:
+        stop_workers(processes, stop_event)
@@ -0,0 +1,96 @@
+"""Compares the block-vectorized ASS writer with the previous per-event implementation.
+
+Usage:
+    python -m benchmarks.bench_ass --words 100000 1000000 --repeat 3
+
+Builds synthetic transcripts of the given word counts (12 words per segment, with
+word timings) and times create_ass_file against the previous implementation, kept
+below as `legacy_create_ass_file`. The transcripts are written twice: without word
+timings, where both spread each segment evenly and must produce identical files,
+and with them, which only the new writer uses. Peak memory is the Python heap
+allocated during the call (tracemalloc), with the transcript itself excluded.
+Prints JSON.
+"""
+import os
+import json
+import time
+import filecmp
+import argparse
+import tempfile
+import tracemalloc
+from app.services import create_ass_file, format_time
+from app.schemas import SubtitleConfig
+from app.config import DEFAULT_FONT_NAME
+from benchmarks.media import make_segments
+
+WORDS_PER_SEGMENT = 12
+
+def legacy_create_ass_file(segments, ass_path: str, settings: SubtitleConfig) -> None:
+    """create_ass_file before the vectorized engine: even spread, timedelta formatting, one write per event."""
+    hex_color = settings.subtitle_color.lstrip("#")
+    bgr_hex = f"&H00{hex_color[4:6]}{hex_color[2:4]}{hex_color[0:2]}"
+    with open(ass_path, "w", encoding="utf-8") as f:
+        f.write("[Script Info]\nScriptType: v4.00+\nPlayResX:1280\nPlayResY:720\nWrapStyle:0\nScaledBorderAndShadow:yes\n\n")
+        f.write("[V4+ Styles]\nFormat: Name,Fontname,Fontsize,PrimaryColour,Bold,Italic,Underline,StrikeOut,ScaleX,ScaleY,Spacing,Angle,BorderStyle,Outline,Shadow,Alignment,MarginL,MarginR,MarginV,Encoding\n")
+        f.write(f"Style: Default,{DEFAULT_FONT_NAME},{settings.font_size},{bgr_hex},{settings.font_weight},0,0,0,100,100,0,0,1,2,{settings.shadow_strength},{settings.alignment},10,10,{settings.margin_v},1\n\n")
+        f.write("[Events]\nFormat: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text\n")
+        for segment in segments:
+            words = segment.text.strip().split()
+            if not words:
+                continue
+            duration = segment.end - segment.start
+            if duration <= 0:
+                continue
+            avg_word_duration = duration / len(words)
+            for i in range(0, len(words), settings.max_words_per_line):
+                chunk = words[i:i + settings.max_words_per_line]
+                chunk_start = segment.start + i * avg_word_duration
+                chunk_end = chunk_start + len(chunk) * avg_word_duration
+                text = " ".join(chunk)
+                if settings.enable_bounce:
+                    text = r"{\fscx30\fscy30\t(0,75,\fscx115\fscy115)\t(75,150,\fscx100\fscy100)}" + text
+                f.write(f"Dialogue: 0,{format_time(chunk_start)},{format_time(chunk_end)},Default,,0,0,0,,{text}\n")
+
+def measure(fn, segments, path: str, settings: SubtitleConfig, repeat: int) -> dict:
+    """Best wall time of `repeat` runs, and the peak heap of one more."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(segments, path, settings)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(segments, path, settings)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 3), "peak_mb": round(peak / 2**20, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    settings = SubtitleConfig()
+    report = {"words_per_segment": WORDS_PER_SEGMENT, "max_words_per_line": settings.max_words_per_line, "runs": []}
+    with tempfile.TemporaryDirectory() as work_dir:
+        legacy_path = os.path.join(work_dir, "legacy.ass")
+        new_path = os.path.join(work_dir, "new.ass")
+        for words in args.words:
+            timed = make_segments(max(1, words // WORDS_PER_SEGMENT), words=WORDS_PER_SEGMENT)
+            spread = [segment.__class__(segment.start, segment.end, segment.text) for segment in timed]
+
+            legacy = measure(legacy_create_ass_file, spread, legacy_path, settings, args.repeat)
+            new = measure(create_ass_file, spread, new_path, settings, args.repeat)
+            identical = filecmp.cmp(legacy_path, new_path, shallow=False)
+            new_timed = measure(create_ass_file, timed, new_path, settings, args.repeat)
+            report["runs"].append({
+                "words": words,
+                "legacy": legacy,
+                "vectorized": {**new, "speedup": round(legacy["seconds"] / max(new["seconds"], 1e-9), 2), "identical": identical},
+                "vectorized_word_timestamps": new_timed,
+                "file_mb": round(os.path.getsize(new_path) / 2**20, 2),
+            })
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
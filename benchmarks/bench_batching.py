@@ -0,0 +1,76 @@
+"""Measures aggregate throughput of cross-request batched inference under concurrency.
+
+Usage:
+    python -m benchmarks.bench_batching path/to/video.mp4 --concurrency 1 4 8 [--gpu]
+
+For each concurrency level, the same audio is transcribed by N threads at once, first
+through the plain model (one request at a time inside CTranslate2) and then through
+BatchedTranscriber. Prints JSON with audio-seconds processed per wall second and the
+mean per-request latency for both engines.
+"""
+import json
+import time
+import argparse
+import threading
+from app.services import ModelManager, extract_audio_array, SAMPLE_RATE
+from app.batching import BatchedTranscriber
+
+def run_concurrent(transcribe, audio, concurrency: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def one_request():
+        start = time.perf_counter()
+        transcribe(audio)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=one_request) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    audio_seconds = concurrency * len(audio) / SAMPLE_RATE
+    return {
+        "wall_seconds": round(wall, 2),
+        "audio_seconds_per_second": round(audio_seconds / wall, 2),
+        "mean_latency_seconds": round(sum(latencies) / len(latencies), 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Video or audio file with speech")
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--gpu", action="store_true", help="Load the model on CUDA")
+    args = parser.parse_args()
+
+    audio = extract_audio_array(args.input)
+    model = ModelManager.load_model(use_gpu=args.gpu)
+    batcher = BatchedTranscriber(model)
+
+    def sequential(samples):
+        segments, _ = model.transcribe(samples, language=args.lang)
+        return list(segments)
+
+    def batched(samples):
+        return batcher.transcribe(samples, args.lang)
+
+    # Warm both paths once so allocation/JIT costs aren't measured
+    sequential(audio[: SAMPLE_RATE * 10])
+    batched(audio[: SAMPLE_RATE * 10])
+
+    report = {"input": args.input, "media_seconds": round(len(audio) / SAMPLE_RATE, 2), "runs": []}
+    for concurrency in args.concurrency:
+        report["runs"].append({
+            "concurrency": concurrency,
+            "sequential": run_concurrent(sequential, audio, concurrency),
+            "batched": run_concurrent(batched, audio, concurrency),
+        })
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
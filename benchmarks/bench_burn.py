@@ -0,0 +1,51 @@
+"""Compares single-process and segmented parallel subtitle burning.
+
+Usage:
+    python -m benchmarks.bench_burn --durations 60 300 1200 --parallelism 2 4 8
+
+Generates synthetic test videos with ffmpeg's lavfi sources (keyframe every 2 s),
+a dense ASS script for each, and times burn_subtitles against
+burn_subtitles_segmented at each parallelism level. Prints JSON.
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+from app.services import create_ass_file, burn_subtitles, burn_subtitles_segmented
+from app.schemas import SubtitleConfig
+from benchmarks.media import make_video, make_segments
+
+def make_ass(path: str, duration: int) -> None:
+    create_ass_file(make_segments(max(1, duration // 2 - 1)), path, SubtitleConfig())
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return round(time.perf_counter() - start, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=int, nargs="+", default=[60, 300, 1200])
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--preset", default="ultrafast")
+    args = parser.parse_args()
+
+    report = {"cpu_count": os.cpu_count(), "size": args.size, "preset": args.preset, "runs": []}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for duration in args.durations:
+            video = os.path.join(work_dir, f"in_{duration}.mp4")
+            ass = os.path.join(work_dir, f"in_{duration}.ass")
+            make_video(video, duration, args.size)
+            make_ass(ass, duration)
+
+            run = {"duration": duration, "single_seconds": timed(burn_subtitles, video, ass, os.path.join(work_dir, "single.mp4"), args.preset)}
+            for parallelism in args.parallelism:
+                seconds = timed(burn_subtitles_segmented, video, ass, os.path.join(work_dir, f"seg_{parallelism}.mp4"), args.preset, parallelism)
+                run[f"segmented_{parallelism}"] = {"seconds": seconds, "speedup": round(run["single_seconds"] / max(seconds, 1e-9), 2)}
+            report["runs"].append(run)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
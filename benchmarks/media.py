@@ -0,0 +1,38 @@
+"""Synthetic test media generated locally with ffmpeg's lavfi sources."""
+import subprocess
+from typing import List
+from app.services import TranscriptSegment, TranscriptWord
+
+# Voiced harmonics with vowel-like formants, a ~4 Hz syllable envelope and a pause every
+# 5 s. Whisper decodes it like any other audio, but the Silero VAD (parallel mode,
+# batched engine) classifies it as non-speech: benchmark those paths on real recordings.
+SPEECHLIKE_EXPR = (
+    "(0.4*sin(2*PI*(120+20*sin(2*PI*0.5*t))*t)+0.25*sin(2*PI*730*t)+0.15*sin(2*PI*1090*t)+0.1*sin(2*PI*2440*t))"
+    "*(0.5-0.5*cos(2*PI*4*t))*lt(mod(t,5),3.5)"
+)
+
+AUDIO_SOURCES = {
+    "speechlike": lambda duration: f"aevalsrc='{SPEECHLIKE_EXPR}':s=44100:d={duration}",
+    "tone": lambda duration: f"sine=frequency=440:duration={duration}",
+    "none": None,
+}
+
+def make_video(path: str, duration: int, size: str, fps: int = 25, audio: str = "tone") -> None:
+    """Writes an H.264 test pattern (keyframe every 2 s) with the chosen audio track."""
+    cmd = ["ffmpeg", "-y", "-v", "error", "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={fps}:duration={duration}"]
+    source = AUDIO_SOURCES[audio]
+    if source:
+        cmd += ["-f", "lavfi", "-i", source(duration), "-c:a", "aac", "-shortest"]
+    cmd += ["-c:v", "libx264", "-preset", "ultrafast", "-g", str(fps * 2), "-pix_fmt", "yuv420p", path]
+    subprocess.run(cmd, check=True)
+
+def make_segments(count: int, spacing: float = 2.0, words: int = 12) -> List[TranscriptSegment]:
+    """`count` evenly spaced segments of `words` words each, with word timings."""
+    segments = []
+    for i in range(count):
+        start = i * spacing
+        text = " ".join(f"word{j}" for j in range(words))
+        step = (spacing * 0.9) / words
+        segment_words = [TranscriptWord(start + j * step, start + (j + 1) * step, f" word{j}", 1.0) for j in range(words)]
+        segments.append(TranscriptSegment(start=start, end=start + spacing * 0.9, text=" " + text, words=segment_words))
+    return segments
@@ -0,0 +1,326 @@
+"""End-to-end benchmark suite on synthetic media, with baseline comparison.
+
+Usage:
+    python -m benchmarks.suite --profile quick --output results.json
+    python -m benchmarks.suite --baseline baseline.json            # exit 1 on regression
+    python -m benchmarks.suite --only burn create_ass --save-baseline baseline.json
+
+Generates test videos with ffmpeg's lavfi sources at several durations and resolutions
+(speech-like, tone or no audio) and measures, per scenario:
+
+    extract      in-memory audio extraction
+    transcribe   a tiny Whisper model on CPU (first run downloads it)
+    create_ass   create_ass_file on very large segment lists
+    burn         burn_subtitles at each video_encoding_preset
+    api          concurrent POST /generate against a local uvicorn server
+
+Each in-process scenario runs in a fresh spawned process, so peak RSS is its own.
+The JSON report holds latency percentiles, throughput, real-time factor (processing
+seconds per media second) and peak RSS; --baseline compares p50 latencies against
+an earlier report and fails when any scenario is slower than --threshold.
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import argparse
+import platform
+import tempfile
+import resource
+import subprocess
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import httpx
+from benchmarks.media import make_video, make_segments
+
+PROFILES = {
+    "quick": {
+        "durations": [10], "sizes": ["640x360"], "audio": ["speechlike"], "presets": ["ultrafast"],
+        "ass_segments": [10_000], "api_concurrency": [2], "api_requests": 4, "repeat": 3,
+    },
+    "full": {
+        "durations": [30, 120], "sizes": ["640x360", "1280x720"], "audio": ["speechlike", "tone", "none"],
+        "presets": ["ultrafast", "veryfast", "medium"], "ass_segments": [10_000, 100_000],
+        "api_concurrency": [1, 4], "api_requests": 8, "repeat": 5,
+    },
+}
+SCENARIOS = ["extract", "transcribe", "create_ass", "burn", "api"]
+
+def percentiles(samples: List[float]) -> dict:
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        # Nearest-rank percentile
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {
+        "p50": round(rank(50), 4), "p90": round(rank(90), 4), "p99": round(rank(99), 4),
+        "mean": round(sum(ordered) / len(ordered), 4), "runs": len(ordered),
+    }
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+# --- in-process scenarios: setup once, then time `repeat` calls of the returned function ---
+
+def setup_extract(params: dict) -> Callable[[], None]:
+    from app.services import extract_audio_array
+    return lambda: extract_audio_array(params["video"])
+
+def setup_transcribe(params: dict) -> Callable[[], None]:
+    from app.services import ModelManager, extract_audio_array, generate_subtitles
+    audio = extract_audio_array(params["video"])
+    # Load outside the timed runs (the reported setup_seconds includes it)
+    ModelManager.load_model(use_gpu=False, model_size=params["model_size"])
+    return lambda: generate_subtitles(audio, "en", use_gpu=False, model_size=params["model_size"])
+
+def setup_create_ass(params: dict) -> Callable[[], None]:
+    from app.services import create_ass_file
+    from app.schemas import SubtitleConfig
+    segments = make_segments(params["segments"])
+    settings = SubtitleConfig()
+    path = os.path.join(params["work_dir"], f"bench_{os.getpid()}.ass")
+    return lambda: create_ass_file(segments, path, settings)
+
+def setup_burn(params: dict) -> Callable[[], None]:
+    from app.services import create_ass_file, burn_subtitles
+    from app.schemas import SubtitleConfig
+    ass_path = os.path.join(params["work_dir"], f"burn_{os.getpid()}.ass")
+    create_ass_file(make_segments(max(1, params["media_seconds"] // 2)), ass_path, SubtitleConfig())
+    output = os.path.join(params["work_dir"], f"burn_{os.getpid()}.mp4")
+    return lambda: burn_subtitles(params["video"], ass_path, output, params["preset"])
+
+SETUPS = {"extract": setup_extract, "transcribe": setup_transcribe, "create_ass": setup_create_ass, "burn": setup_burn}
+
+def _child(kind: str, params: dict, repeat: int, conn) -> None:
+    try:
+        start = time.perf_counter()
+        run = SETUPS[kind](params)
+        setup_seconds = time.perf_counter() - start
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            samples.append(time.perf_counter() - start)
+        conn.send({
+            "samples": samples, "setup_seconds": round(setup_seconds, 3),
+            # RUSAGE_CHILDREN is no use for ffmpeg: Linux carries the parent's peak into forked children
+            "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+        })
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+
+def run_isolated(kind: str, params: dict, repeat: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child, args=(kind, params, repeat, child_conn))
+    process.start()
+    result = parent_conn.recv()
+    process.join()
+    return result
+
+def summarize(raw: dict, media_seconds: Optional[float] = None, units: Optional[float] = None, unit_name: str = "") -> dict:
+    if "error" in raw:
+        return {"error": raw["error"]}
+    latency = percentiles(raw.pop("samples"))
+    result = {"seconds": latency, **raw}
+    if media_seconds:
+        result["rtf"] = round(latency["p50"] / media_seconds, 4)
+        result["media_seconds_per_second"] = round(media_seconds / latency["p50"], 2)
+    if units:
+        result[f"{unit_name}_per_second"] = round(units / latency["p50"], 1)
+    return result
+
+# --- API load: a real server process, many concurrent clients ---
+
+def process_peak_rss_mb(pid: int) -> Optional[float]:
+    """Peak RSS of another live process (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def run_api_load(video: str, media_seconds: float, concurrency: int, requests: int, work_dir: str) -> dict:
+    port = free_port()
+    env = dict(
+        os.environ, SUBIT_WORKERS="0", SUBIT_MODEL_SIZE="tiny", SUBIT_MAX_SYNC_REQUESTS=str(concurrency),
+        SUBIT_JOBS_DB=os.path.join(work_dir, "jobs.db"),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    config_json = json.dumps({"model_size": "tiny", "use_gpu": False, "video_encoding_preset": "ultrafast"})
+    try:
+        deadline = time.monotonic() + 300
+        while True:
+            try:
+                httpx.get(base_url, timeout=1)
+                break
+            except httpx.TransportError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    return {"error": "API server did not start"}
+                time.sleep(0.5)
+
+        def one_request(_) -> tuple:
+            with open(video, "rb") as f:
+                start = time.perf_counter()
+                response = httpx.post(
+                    f"{base_url}/generate", files={"video": ("bench.mp4", f, "video/mp4")},
+                    data={"config_json": config_json}, timeout=600,
+                )
+                return time.perf_counter() - start, response.status_code
+
+        # One warm-up request so the first measured one doesn't pay for model loading
+        one_request(None)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(one_request, range(requests)))
+        wall = time.perf_counter() - start
+        server_peak_rss_mb = process_peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(30)
+
+    latencies = [seconds for seconds, status in results if status == 200]
+    statuses: Dict[str, int] = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    if not latencies:
+        return {"error": f"no successful requests: {statuses}"}
+    return {
+        "seconds": percentiles(latencies), "statuses": statuses,
+        "requests_per_second": round(len(latencies) / wall, 3),
+        "media_seconds_per_second": round(len(latencies) * media_seconds / wall, 2),
+        "server_peak_rss_mb": server_peak_rss_mb,
+    }
+
+# --- report + baseline ---
+
+def machine_info() -> dict:
+    try:
+        ffmpeg = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout.splitlines()[0]
+    except (OSError, IndexError):
+        ffmpeg = None
+    return {
+        "platform": platform.platform(), "python": platform.python_version(),
+        "cpu_count": os.cpu_count(), "ffmpeg": ffmpeg,
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Scenarios whose p50 latency grew by more than `threshold` (a fraction) over the baseline."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name, {})
+        if "seconds" not in result or "seconds" not in old:
+            continue
+        before, after = old["seconds"]["p50"], result["seconds"]["p50"]
+        change = (after - before) / before if before else 0.0
+        result["baseline_p50"] = before
+        result["change"] = round(change, 4)
+        if change > threshold:
+            regressions.append({"scenario": name, "baseline_p50": before, "p50": after, "change": round(change, 4)})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--repeat", type=int, help="Timed runs per scenario (default: from the profile)")
+    parser.add_argument("--model-size", default="tiny")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed p50 slowdown before failing (fraction)")
+    parser.add_argument("--save-baseline", help="Also write the report here for future comparisons")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    repeat = args.repeat or profile["repeat"]
+    results: Dict[str, dict] = {}
+
+    def record(name: str, result: dict) -> None:
+        results[name] = result
+        summary = result.get("error") or f"p50 {result['seconds']['p50']}s"
+        print(f"{name}: {summary}", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory(prefix="subit_bench_") as work_dir:
+        videos = {}
+        for duration in profile["durations"]:
+            for size in profile["sizes"]:
+                for audio in profile["audio"]:
+                    path = os.path.join(work_dir, f"in_{size}_{duration}s_{audio}.mp4")
+                    make_video(path, duration, size, audio=audio)
+                    videos[(duration, size, audio)] = path
+
+        for (duration, size, audio), video in videos.items():
+            params = {"video": video, "media_seconds": duration, "work_dir": work_dir}
+            if "extract" in args.only and audio != "none":
+                record(f"extract/{size}/{duration}s/{audio}", summarize(run_isolated("extract", params, repeat), duration))
+            if "burn" in args.only and audio == profile["audio"][0]:
+                for preset in profile["presets"]:
+                    raw = run_isolated("burn", {**params, "preset": preset}, repeat)
+                    record(f"burn/{size}/{duration}s/{preset}", summarize(raw, duration))
+
+        # Transcription and API load depend on duration only; use the smallest video with speech-like audio
+        speech_videos = {d: v for (d, size, audio), v in videos.items() if audio == "speechlike" and size == profile["sizes"][0]}
+        for duration, video in speech_videos.items():
+            if "transcribe" in args.only:
+                params = {"video": video, "model_size": args.model_size}
+                raw = run_isolated("transcribe", params, repeat)
+                record(f"transcribe/{args.model_size}/{duration}s", summarize(raw, duration))
+
+        if "create_ass" in args.only:
+            for count in profile["ass_segments"]:
+                raw = run_isolated("create_ass", {"segments": count, "work_dir": work_dir}, repeat)
+                record(f"create_ass/{count}", summarize(raw, units=count, unit_name="segments"))
+
+        if "api" in args.only and speech_videos:
+            duration = min(speech_videos)
+            for concurrency in profile["api_concurrency"]:
+                result = run_api_load(speech_videos[duration], duration, concurrency, profile["api_requests"], work_dir)
+                record(f"api/generate/{duration}s/c{concurrency}", result)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "profile": args.profile, "repeat": repeat,
+        "machine": machine_info(), "results": results,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['scenario']}: p50 {regression['baseline_p50']}s -> {regression['p50']}s "
+            f"({regression['change']:+.0%})", file=sys.stderr
+        )
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 import uvicorn
+from app.metrics_dir import use_metrics_dir
 
 if __name__ == "__main__":
+    # Before uvicorn imports the app, and prometheus_client with it
+    use_metrics_dir()
     uvicorn.run("app.main:app", host="0.0.0.0", port=5000, reload=True)
@@ -111,7 +111,8 @@ def extract_audio(video_path, audio_path):
         start = time.time()
         subprocess.run([
             "ffmpeg", "-y", "-i", video_path,
-            "-vn", "-acodec", "pcm_s16le", "-ar", "44100", "-ac", "2",
+            # Whisper resamples to 16 kHz mono anyway; extracting it directly keeps the WAV ~5x smaller
+            "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
             audio_path
         ], check=True)
         elapsed = time.time() - start
@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+# Settings are read when the app modules are imported: no worker processes, model
+# preloading or background sweeps, and a job database and metric directory of the
+# test session's own
+_session_dir = tempfile.mkdtemp(prefix="scribeflow-tests-")
+os.environ["SUBIT_WORKERS"] = "0"
+os.environ["SUBIT_PRELOAD_MODEL"] = "0"
+os.environ["SUBIT_SWEEP_INTERVAL"] = "0"
+os.environ["SUBIT_EVENT_POLL_INTERVAL"] = "0.01"
+os.environ["SUBIT_JOBS_DB"] = os.path.join(_session_dir, "jobs.db")
+os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(_session_dir, "metrics")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+from app.jobs import JobStore
+
+@pytest.fixture
+def job_store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    store.init_db()
+    return store
+
+@pytest.fixture
+def client(job_store, monkeypatch):
+    """API client whose job queue is the test's own database."""
+    monkeypatch.setattr(main, "job_store", job_store)
+    with TestClient(main.app) as client:
+        yield client
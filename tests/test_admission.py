@@ -0,0 +1,39 @@
+import threading
+import pytest
+from app import main
+from app.jobs import STATUS_QUEUED
+from app.schemas import SubtitleConfig
+
+VIDEO = {"video": ("clip.mp4", b"\x00" * 4096, "video/mp4")}
+
+@pytest.fixture
+def busy_slots(monkeypatch):
+    """A single sync pipeline slot, already taken."""
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(main, "sync_slots", slots)
+    slots.acquire()
+    return slots
+
+def test_full_job_queue_is_rejected_with_429(client, job_store, monkeypatch):
+    monkeypatch.setattr(main, "MAX_QUEUED_JOBS", 1)
+    job_store.create_job("/uploads/queued.mp4", "queued.mp4", SubtitleConfig())
+
+    response = client.post("/jobs", files=VIDEO)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert job_store.count_jobs(STATUS_QUEUED) == 1
+
+@pytest.mark.parametrize("path, data", [("/generate", {}), ("/generate/variants", {"configs_json": "[{}]"})])
+def test_sync_requests_beyond_the_slots_are_rejected_with_429(client, busy_slots, path, data):
+    response = client.post(path, files=VIDEO, data=data)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    # The rejected request didn't give back a slot it never held
+    assert not busy_slots.acquire(blocking=False)
+
+def test_previews_share_the_sync_slots(client, job_store, busy_slots):
+    job_id = job_store.create_job("/uploads/queued.mp4", "queued.mp4", SubtitleConfig())
+
+    assert client.post(f"/jobs/{job_id}/preview").status_code == 429
+    assert client.post("/preview", files=VIDEO, data={"transcript_key": "0" * 64}).status_code == 429
+    assert not busy_slots.acquire(blocking=False)
@@ -0,0 +1,85 @@
+import os
+import time
+import pytest
+from app.artifacts import ArtifactStore, Area, AREA_TRANSCRIPTS
+from app.cache import TranscriptCache, transcript_key
+from app.services import TranscriptSegment
+
+@pytest.fixture
+def transcript_store(tmp_path):
+    """Artifact store with a transcripts area of 1 KB."""
+    return ArtifactStore({AREA_TRANSCRIPTS: Area(str(tmp_path / "transcripts"), 0, 1024)})
+
+@pytest.fixture
+def transcript_cache(transcript_store):
+    return TranscriptCache(transcript_store)
+
+def segments(text: str = "hello world"):
+    return [TranscriptSegment(0.0, 1.5, text), TranscriptSegment(1.5, 3.0, text)]
+
+def key(i: int) -> str:
+    return f"{i:064x}"
+
+def test_round_trip(transcript_cache):
+    transcript_cache.put(key(1), segments())
+    assert transcript_cache.contains(key(1))
+    assert transcript_cache.get(key(1)) == segments()
+    assert transcript_cache.get(key(2)) is None
+
+def test_transcript_key_depends_on_settings(tmp_path):
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"\x01\x02" * 100)
+    base = transcript_key(str(audio), "en", "small", "int8")
+    assert len(base) == 64
+    assert base == transcript_key(str(audio), "en", "small", "int8")
+    assert base != transcript_key(str(audio), "de", "small", "int8")
+    assert base != transcript_key(str(audio), "en", "small", "int8", mode="parallel")
+
+@pytest.mark.parametrize("bad_key", ["../../jobs", "", "AB" * 32, key(1) + "0"])
+def test_invalid_keys_never_touch_the_disk(transcript_cache, bad_key):
+    assert not transcript_cache.contains(bad_key)
+    assert transcript_cache.get(bad_key) is None
+    with pytest.raises(ValueError):
+        transcript_cache.put(bad_key, segments())
+
+def test_unreadable_entry_is_a_miss_and_removed(transcript_cache):
+    with open(transcript_cache._path(key(1)), "w") as f:
+        f.write("{not json")
+    assert transcript_cache.get(key(1)) is None
+    assert not transcript_cache.contains(key(1))
+
+def age(cache, key: str, seconds: float) -> None:
+    """Backdates the entry's last use."""
+    used = time.time() - seconds
+    os.utime(cache._path(key), (used, used))
+
+def test_writes_evict_least_recently_used_entries_over_quota(transcript_cache):
+    # Each entry is ~150 bytes and the area holds 1 KB
+    for i in range(5):
+        transcript_cache.put(key(i), segments())
+        age(transcript_cache, key(i), 100 - i)
+    # A hit marks the oldest entry as just used
+    assert transcript_cache.get(key(0)) is not None
+
+    for i in range(5, 8):
+        transcript_cache.put(key(i), segments())
+    kept = [i for i in range(8) if transcript_cache.contains(key(i))]
+    assert 0 in kept and 7 in kept and 1 not in kept
+    assert sum(os.path.getsize(transcript_cache._path(key(i))) for i in kept) <= 1024
+
+def test_sweep_removes_expired_entries(transcript_store, transcript_cache):
+    transcript_store.areas[AREA_TRANSCRIPTS].ttl_seconds = 60
+    transcript_cache.put(key(1), segments())
+    transcript_cache.put(key(2), segments())
+    age(transcript_cache, key(1), 120)
+
+    transcript_store.sweep()
+    assert not transcript_cache.contains(key(1))
+    assert transcript_cache.contains(key(2))
+
+def test_area_of_tells_which_paths_sweeps_touch(transcript_store, tmp_path):
+    area_path = transcript_store.path(AREA_TRANSCRIPTS)
+    assert transcript_store.area_of(area_path) == AREA_TRANSCRIPTS
+    assert transcript_store.area_of(os.path.join(area_path, "batch")) == AREA_TRANSCRIPTS
+    assert transcript_store.area_of(str(tmp_path / "transcripts-batch")) is None
+    assert transcript_store.area_of(str(tmp_path)) is None
@@ -0,0 +1,24 @@
+import shutil
+import pytest
+from app import main
+from app.jobs import STATUS_QUEUED
+
+VIDEO = {"video": ("clip.mp4", b"\x00" * 4096, "video/mp4")}
+
+@pytest.mark.parametrize("path", ["/restyle", "/preview"])
+def test_transcript_keys_must_be_digests(client, path):
+    response = client.post(path, files=VIDEO, data={"transcript_key": "../../jobs"})
+    assert response.status_code == 422
+
+def test_upload_over_the_size_limit_is_rejected_with_413(client, job_store, monkeypatch):
+    monkeypatch.setattr(main, "MAX_INPUT_BYTES", 1024)
+
+    response = client.post("/jobs", files=VIDEO)
+    assert response.status_code == 413
+    assert job_store.count_jobs(STATUS_QUEUED) == 0
+
+@pytest.mark.skipif(shutil.which("ffprobe") is None, reason="needs ffprobe")
+def test_unreadable_upload_is_rejected_with_415(client, job_store):
+    response = client.post("/jobs", files={"video": ("clip.mp4", b"not a video" * 100, "video/mp4")})
+    assert response.status_code == 415
+    assert job_store.count_jobs(STATUS_QUEUED) == 0
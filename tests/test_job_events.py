@@ -0,0 +1,37 @@
+import json
+from app.schemas import SubtitleConfig
+
+TRANSCRIPT_KEY = "0" * 64
+
+def sse_events(body: str) -> list:
+    """(id, event, data) of every message of an event stream."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines() if not line.startswith(":"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_event_stream_resumes_after_last_event_id(client, job_store):
+    job_id = job_store.create_job("/uploads/clip.mp4", "clip.mp4", SubtitleConfig())
+    stage_id = job_store.add_event(job_id, "stage", {"stage": "transcribing"})
+    segment_id = job_store.add_event(job_id, "segment", {"text": "hello"})
+    done_id = job_store.add_event(job_id, "done", {"transcript_key": TRANSCRIPT_KEY})
+
+    events = sse_events(client.get(f"/jobs/{job_id}/events").text)
+    assert [event_id for event_id, _, _ in events] == [stage_id, segment_id, done_id]
+
+    resumed = sse_events(client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": str(stage_id)}).text)
+    assert resumed == [(segment_id, "segment", {"text": "hello"}), (done_id, "done", {"transcript_key": TRANSCRIPT_KEY})]
+
+def test_event_stream_of_a_purged_job_ends_with_its_status(client, job_store):
+    job_id = job_store.create_job("/uploads/clip.mp4", "clip.mp4", SubtitleConfig())
+    job_store.claim_next("worker")
+    last_id = job_store.add_event(job_id, "stage", {"stage": "rendering"})
+    job_store.fail_job(job_id, "FFmpeg failed to burn subtitles")
+    job_store.purge_events(0)
+
+    events = sse_events(client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": str(last_id)}).text)
+    assert events == [(last_id, "failed", {"error": "FFmpeg failed to burn subtitles"})]
+
+def test_event_stream_of_an_unknown_job_is_404(client):
+    assert client.get("/jobs/missing/events").status_code == 404
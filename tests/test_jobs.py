@@ -0,0 +1,54 @@
+import time
+from app.jobs import STATUS_QUEUED, STATUS_RUNNING
+from app.jobs import STATUS_DONE
+from app.schemas import SubtitleConfig
+
+def create(job_store, name: str) -> str:
+    job_id = job_store.create_job(f"/uploads/{name}.mp4", f"{name}.mp4", SubtitleConfig())
+    # created_at orders the queue; keep it strictly increasing
+    time.sleep(0.001)
+    return job_id
+
+def test_claim_next_takes_the_oldest_queued_job(job_store):
+    first, second = create(job_store, "first"), create(job_store, "second")
+
+    job = job_store.claim_next("worker-1")
+    assert job["id"] == first
+    assert job["status"] == STATUS_RUNNING and job["worker_id"] == "worker-1"
+    assert job_store.get_job(first)["status"] == STATUS_RUNNING
+    assert job_store.claim_next("worker-2")["id"] == second
+    assert job_store.claim_next("worker-3") is None
+
+def test_claimed_jobs_are_not_claimed_again(job_store):
+    job_ids = {create(job_store, f"job{i}") for i in range(5)}
+
+    claimed = [job_store.claim_next(f"worker-{i}") for i in range(5)]
+    assert {job["id"] for job in claimed} == job_ids
+    assert job_store.count_jobs(STATUS_QUEUED) == 0
+
+def test_requeue_orphans_only_requeues_jobs_of_dead_workers(job_store):
+    dead, alive, other = create(job_store, "dead"), create(job_store, "alive"), create(job_store, "other")
+    job_store.claim_next("host:1")
+    job_store.claim_next("host:2")
+    job_store.claim_next("elsewhere:1")
+
+    requeued = job_store.requeue_orphans("host:", lambda worker_id: worker_id == "host:2")
+    assert requeued == 1
+    job = job_store.get_job(dead)
+    assert job["status"] == STATUS_QUEUED and job["worker_id"] is None and job["started_at"] is None
+    assert job_store.get_job(alive)["status"] == STATUS_RUNNING
+    assert job_store.get_job(other)["status"] == STATUS_RUNNING
+    # The requeued job is the next one claimed
+    assert job_store.claim_next("host:3")["id"] == dead
+
+def test_purge_events_keeps_events_of_unfinished_jobs(job_store):
+    finished, running = create(job_store, "finished"), create(job_store, "running")
+    for job_id in (finished, running):
+        job_store.claim_next("worker")
+        job_store.add_event(job_id, "stage", {"stage": "transcribing"})
+    job_store.complete_job(finished, "/outputs/finished.mp4")
+
+    assert job_store.purge_events(0) == 1
+    assert job_store.events_since(finished) == []
+    assert len(job_store.events_since(running)) == 1
+    assert job_store.get_job(finished)["status"] == STATUS_DONE
@@ -0,0 +1,13 @@
+from app import parallel
+
+def test_pool_is_kept_for_its_size_and_replaced_for_another():
+    first = parallel._get_executor(1)
+    try:
+        assert parallel._get_executor(1) is first
+        second = parallel._get_executor(2)
+        assert second is not first
+        assert second._max_workers == 2
+        assert parallel._get_executor(2) is second
+    finally:
+        parallel._executor.shutdown()
+        parallel._executor = None
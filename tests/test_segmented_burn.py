@@ -0,0 +1,37 @@
+from app.services import BOUNCE_EFFECT, plan_segments, shift_ass_file
+
+def test_plan_segments_cuts_on_keyframes_near_even_splits():
+    keyframes = [float(k) for k in range(0, 120, 2)]
+    assert plan_segments(keyframes, 120.0, 4) == [(0.0, 30.0), (30.0, 60.0), (60.0, 90.0), (90.0, 120.0)]
+
+    sparse = [0.0, 37.0, 80.0]
+    assert plan_segments(sparse, 120.0, 4) == [(0.0, 37.0), (37.0, 80.0), (80.0, 120.0)]
+
+def test_plan_segments_keeps_segments_long_enough():
+    keyframes = [float(k) for k in range(0, 30, 2)]
+    # Only room for three segments of at least 10 s
+    assert plan_segments(keyframes, 30.0, 8) == [(0.0, 10.0), (10.0, 20.0), (20.0, 30.0)]
+    # Too short to split at all
+    assert plan_segments(keyframes, 15.0, 4) == [(0.0, 15.0)]
+    # No keyframe leaves both sides long enough
+    assert plan_segments([0.0, 3.0, 27.0], 30.0, 2) == [(0.0, 30.0)]
+
+def test_shift_ass_file_keeps_events_of_the_range_only(tmp_path):
+    script = tmp_path / "full.ass"
+    script.write_text(
+        "[Events]\n"
+        f"Dialogue: 0,0:00:01.00,0:00:03.00,Default,,0,0,0,,{BOUNCE_EFFECT}before\n"
+        f"Dialogue: 0,0:00:09.00,0:00:11.00,Default,,0,0,0,,{BOUNCE_EFFECT}across, the cut\n"
+        f"Dialogue: 0,0:00:12.50,0:00:13.00,Default,,0,0,0,,{BOUNCE_EFFECT}inside\n"
+        f"Dialogue: 0,0:00:20.00,0:00:21.00,Default,,0,0,0,,{BOUNCE_EFFECT}after\n",
+        encoding="utf-8",
+    )
+    shifted = tmp_path / "segment.ass"
+    shift_ass_file(str(script), str(shifted), 10.0, 20.0)
+
+    assert shifted.read_text(encoding="utf-8").splitlines() == [
+        "[Events]",
+        # Already on screen at the cut: no second pop-in
+        "Dialogue: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,across, the cut",
+        f"Dialogue: 0,0:00:02.50,0:00:03.00,Default,,0,0,0,,{BOUNCE_EFFECT}inside",
+    ]
@@ -0,0 +1,42 @@
+import os
+import threading
+import pytest
+from app.pipeline import output_path_for
+from app.schemas import SubtitleConfig
+
+@pytest.fixture
+def streaming_job(job_store):
+    """A running fragmented burn job and the path its output grows at."""
+    settings = SubtitleConfig(output_mode="burn", fragmented=True)
+    job_id = job_store.create_job("/uploads/clip.mp4", "clip.mp4", settings)
+    job_store.claim_next("worker")
+    output_path = output_path_for(job_id, settings)
+    yield job_id, output_path
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+def test_stream_follows_the_output_until_the_job_finishes(client, job_store, streaming_job):
+    job_id, output_path = streaming_job
+    with open(output_path, "wb") as f:
+        f.write(b"first")
+
+    def finish() -> None:
+        with open(output_path, "ab") as f:
+            f.write(b" second")
+        job_store.complete_job(job_id, output_path)
+
+    timer = threading.Timer(0.3, finish)
+    timer.start()
+    response = client.get(f"/jobs/{job_id}/stream")
+    timer.join()
+    assert response.status_code == 200
+    assert response.content == b"first second"
+
+def test_stream_of_a_job_that_fails_before_writing_is_empty(client, job_store, streaming_job):
+    job_id, _ = streaming_job
+    timer = threading.Timer(0.2, job_store.fail_job, (job_id, "FFmpeg failed to burn subtitles"))
+    timer.start()
+    response = client.get(f"/jobs/{job_id}/stream")
+    timer.join()
+    assert response.status_code == 200
+    assert response.content == b""
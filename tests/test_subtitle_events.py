@@ -0,0 +1,51 @@
+import pytest
+from app.events import event_blocks
+from app.schemas import SubtitleConfig
+from app.services import TranscriptSegment, TranscriptWord, BOUNCE_EFFECT, create_ass_file, format_time
+
+def reference_events(segments, settings: SubtitleConfig) -> list:
+    """Dialogue lines of the per-event writer the block engine replaced (even spread, no word timings)."""
+    lines = []
+    for segment in segments:
+        words = segment.text.strip().split()
+        duration = segment.end - segment.start
+        if not words or duration <= 0:
+            continue
+        step = duration / len(words)
+        for i in range(0, len(words), settings.max_words_per_line):
+            chunk = words[i:i + settings.max_words_per_line]
+            start = segment.start + i * step
+            end = start + len(chunk) * step
+            text = (BOUNCE_EFFECT if settings.enable_bounce else "") + " ".join(chunk)
+            lines.append(f"Dialogue: 0,{format_time(start)},{format_time(end)},Default,,0,0,0,,{text}")
+    return lines
+
+@pytest.mark.parametrize("max_words_per_line", [1, 5, 6, 12])
+@pytest.mark.parametrize("enable_bounce", [False, True])
+def test_ass_events_match_the_per_event_writer(tmp_path, max_words_per_line, enable_bounce):
+    settings = SubtitleConfig(max_words_per_line=max_words_per_line, enable_bounce=enable_bounce)
+    # A few blocks' worth of segments, with untidy spacing and timings that don't round evenly
+    text = "  ".join(f"word{j}" for j in range(11))
+    segments = [TranscriptSegment(i * 1.7, i * 1.7 + 1.53, f" {text} ") for i in range(2500)]
+    segments += [TranscriptSegment(9000.0, 9000.0, "zero length"), TranscriptSegment(9001.0, 9002.0, "  ")]
+
+    ass_path = tmp_path / "subtitles.ass"
+    create_ass_file(segments, str(ass_path), settings)
+    events = [line for line in ass_path.read_text(encoding="utf-8").splitlines() if line.startswith("Dialogue:")]
+    assert events == reference_events(segments, settings)
+
+def test_word_timed_lines_start_and_end_with_their_words():
+    words = [TranscriptWord(1.0 + i, 1.5 + i, f" w{i}", 1.0) for i in range(5)]
+    segment = TranscriptSegment(0.5, 6.0, " w0 w1 w2 w3 w4", words=words)
+
+    (starts, ends, texts), = event_blocks([segment], max_words_per_line=3)
+    assert texts == ["w0 w1 w2", "w3 w4"]
+    assert starts.tolist() == [1.0, 4.0]
+    assert ends.tolist() == [3.5, 5.5]
+
+def test_words_without_spaces_are_joined_as_whisper_wrote_them():
+    words = [TranscriptWord(i, i + 1, word, 1.0) for i, word in enumerate(["今天", "天气", "很", "好"])]
+    segment = TranscriptSegment(0.0, 4.0, "今天天气很好", words=words)
+
+    (_, _, texts), = event_blocks([segment], max_words_per_line=2)
+    assert texts == ["今天天气", "很好"]
@@ -0,0 +1,27 @@
+import os
+import time
+import signal
+from app.worker import start_workers, stop_workers, _worker_prefix
+from app.schemas import SubtitleConfig
+
+def wait_for(condition, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.1)
+
+def test_dead_worker_is_replaced_and_its_job_requeued(job_store):
+    processes, stop_event = start_workers(1, job_store.db_path, watch_interval=0.2)
+    try:
+        dead = processes[0]
+        dead_id = f"{_worker_prefix()}{dead.pid}"
+        # A job the worker was in the middle of
+        job_id = job_store.create_job("/uploads/missing.mp4", "missing.mp4", SubtitleConfig())
+        job_store.claim_next(dead_id)
+        os.kill(dead.pid, signal.SIGKILL)
+
+        wait_for(lambda: processes[0] is not dead and processes[0].is_alive())
+        # Back in the queue, where the replacement claims it (and fails it: there is no upload)
+        wait_for(lambda: job_store.get_job(job_id)["worker_id"] == f"{_worker_prefix()}{processes[0].pid}")
+    finally:
+        stop_workers(processes, stop_event)